@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Measure how many files per second the scan report readers normalize.
+#
+# usage (from the top directory):
+#   PYTHONPATH=. devel/benchmark-reader.py example-data/scancode/*/cairo-1.16.0-scan.json
+
+import argparse
+import json
+import time
+
+from scarfer.scan_interface import ScanReportReader
+from scarfer.scan_interface import ScancodeReportReader
+
+def _best_of(rounds, function):
+    best = None
+    for i in range(rounds):
+        start = time.perf_counter()
+        count = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, best
+
+def _normalize(report_file, json_data, compact):
+    reader = ScancodeReportReader(report_file, compact=compact)
+    reader.json_data = json_data
+    reader.check_file_format()
+
+    def normalize():
+        count = 0
+        for f in json_data['files']:
+            if reader._normalize_file(f) is not None:
+                count += 1
+        return count
+    return normalize
+
+def _read(report_file, compact):
+    def read():
+        return len(ScanReportReader(report_file, compact=compact).read()['files'])
+    return read
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scan report normalization')
+    parser.add_argument('files', type=str, nargs='+', help='scan reports to read')
+    parser.add_argument('-r', '--rounds', type=int, default=5, help='number of rounds, the best is reported')
+    args = parser.parse_args()
+
+    for report_file in args.files:
+        with open(report_file) as fp:
+            json_data = json.load(fp)
+        for compact in [False, True]:
+            mode = "compact" if compact else "dict"
+            count, elapsed = _best_of(args.rounds, _normalize(report_file, json_data, compact))
+            print(f'{report_file} normalize ({mode}): {count / elapsed:.0f} files/s')
+            count, elapsed = _best_of(args.rounds, _read(report_file, compact))
+            print(f'{report_file} read      ({mode}): {count / elapsed:.0f} files/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Measure the startup cost of scarfer, the time spent importing
+# modules, using python's -X importtime. Without scarfer arguments only
+# scarfer's main module is imported, with arguments scarfer is run and
+# the modules imported while running are measured too.
+#
+# usage (from the top directory):
+#   PYTHONPATH=. devel/benchmark-startup.py
+#   PYTHONPATH=. devel/benchmark-startup.py -- example-data/cairo-1.16.0-scan.json -ls
+
+import argparse
+import subprocess
+import sys
+import time
+
+IMPORT_TIME_PREFIX = 'import time:'
+
+def _imports(stderr):
+    # (self us, cumulative us, nesting level, module) per imported module
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        self_us, cumulative_us, name = line[len(IMPORT_TIME_PREFIX):].split('|')
+        if not self_us.strip().isdigit():
+            # the header
+            continue
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(self_us), int(cumulative_us), level, name.strip()))
+    return imports
+
+def _run(scarfer_args):
+    if scarfer_args:
+        command = [sys.executable, '-X', 'importtime', '-m', 'scarfer'] + scarfer_args
+    else:
+        command = [sys.executable, '-X', 'importtime', '-c', 'import scarfer.__main__']
+    start = time.perf_counter()
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    elapsed = time.perf_counter() - start
+    imports = _imports(process.stderr)
+    total = sum([cumulative_us for self_us, cumulative_us, level, name in imports if level == 0])
+    return elapsed, total, imports
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scarfer startup')
+    parser.add_argument('scarfer_args', type=str, nargs='*', help='arguments to scarfer, after --')
+    parser.add_argument('-r', '--rounds', type=int, default=5, help='number of rounds, the best is reported')
+    parser.add_argument('-t', '--top', type=int, default=15, help='number of modules, slowest to import first, to list')
+    args = parser.parse_args()
+
+    best = None
+    for i in range(args.rounds):
+        run = _run(args.scarfer_args)
+        if best is None or run[1] < best[1]:
+            best = run
+    elapsed, total, imports = best
+
+    print(f'run:     {elapsed * 1000:.1f} ms')
+    print(f'imports: {total / 1000:.1f} ms ({len(imports)} modules)')
+    print()
+    print(f'{"self ms":>9} {"total ms":>9}  module')
+    for self_us, cumulative_us, level, name in sorted(imports, reverse=True)[:args.top]:
+        print(f'{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}')
+
+
+if __name__ == '__main__':
+    main()
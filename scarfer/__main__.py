@@ -6,19 +6,29 @@
 
 from argparse import RawTextHelpFormatter
 import argparse
+import functools
+import io
 import json
-import yaml
+import re
 import sys
 import os
 
 from scarfer.format.factory import FormatFactory
 from scarfer.scan_interface import ScanReportReader
+from scarfer.scan_interface import ScanReportException
+from scarfer.scan_interface import ALL_FIELDS
+from scarfer.scan_interface import FIELD_COPYRIGHTS
+from scarfer.scan_interface import FIELD_HASHES
 from scarfer.analyzer import Analyzer
+from scarfer.delta import ReportDelta
 from scarfer.format.interface import Settings
 from scarfer.filter_utils import create_filters
+from scarfer.query import Query
+from scarfer.query import QueryException
 from scarfer.config import scarfer_version
 from scarfer.config import scarfer_name
 from scarfer.config import DEFAULT_FILE_EXCLUDE_FILE
+from scarfer.config import DEFAULT_CACHE_SIZE
 
 import logging
 
@@ -44,6 +54,9 @@ OUTPUT_FORMATS = [OUTPUT_FORMAT_JSON, OUTPUT_FORMAT_TEXT, OUTPUT_FORMAT_YAML]
 
 DATE_FMT = '%Y-%m-%d'
 
+# scan reports, possibly compressed, read from directories
+REPORT_FILE_RE = re.compile(r'\.json(\.[a-z0-9]+)?$')
+
 def parse():
 
     description = f'NAME\n  {PROGRAM_NAME} ({PROGRAM_VERSION})\n\n'
@@ -63,16 +76,69 @@ def parse():
         formatter_class=RawTextHelpFormatter
     )
 
-    parser.add_argument('file',
+    parser.add_argument('files',
                         type=str,
-                        help='Scan report to use',
+                        metavar='file',
+                        nargs='+',
+                        help='Scan report to use, may be compressed. If more than one report, or a directory with reports, is given\n'
+                        'each report is output followed by a summary of all reports',
                         default=None)
 
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        help='number of processes reading and analyzing scan reports in parallel, default is 1',
+                        default=1)
+
     parser.add_argument('--normalize',
                         action='store_true',
                         help='quit after scan report normalization and outpout result',
                         default=False)
 
+    parser.add_argument('--stream',
+                        action='store_true',
+                        help='read the scan report incrementally, using less memory for big reports',
+                        default=False)
+
+    parser.add_argument('--diff',
+                        type=str,
+                        metavar='BASELINE',
+                        help='output the files added, removed or changed since the baseline scan report.\n'
+                        'Only these files are filtered and curated',
+                        default=None)
+
+    parser.add_argument('--dedup',
+                        action='store_true',
+                        help='match license and copyright filters once per group of files with identical content (same hash)',
+                        default=False)
+
+    parser.add_argument('--grouped',
+                        action='store_true',
+                        help='output files with identical content (same hash) and scan results as one group, implies --dedup',
+                        default=False)
+
+    parser.add_argument('--cache',
+                        action='store_true',
+                        help='cache normalized scan reports, making repeated use of a scan report faster (not used with --stream)',
+                        default=False)
+
+    parser.add_argument('--cache-dir',
+                        type=str,
+                        dest='cache_dir',
+                        help='directory to cache normalized scan reports in, implies --cache',
+                        default=None)
+
+    parser.add_argument('--cache-size',
+                        type=int,
+                        dest='cache_size',
+                        help=f'maximum size of the cache in MB, default is {DEFAULT_CACHE_SIZE // (1024 * 1024)}',
+                        default=DEFAULT_CACHE_SIZE // (1024 * 1024))
+
+    parser.add_argument('--validate-sample',
+                        type=int,
+                        dest='validate_sample',
+                        help='with --normalize, validate only every N:th normalized file, default is 1 (all files)',
+                        default=1)
+
     parser.add_argument('-m', '--matched-text',
                         action='store_true',
                         help='output information about license matches',
@@ -159,6 +225,18 @@ def parse():
                         help='filter out on file containing file filters',
                         default=[])
 
+    parser.add_argument('-q', '--query',
+                        type=str,
+                        action='append',
+                        help='filter on files matching query, e.g. "(license:gpl or license:lgpl) and not path^=test/"',
+                        default=[])
+
+    parser.add_argument('-eq', '--exclude-query',
+                        type=str,
+                        action='append',
+                        help='filter out files matching query',
+                        default=[])
+
     parser.add_argument('-dde', '--disable-default-excludes',
                         action='store_true',
                         help=f'Disable exclusion of files as specified in {DEFAULT_FILE_EXCLUDE_FILE}')
@@ -180,7 +258,7 @@ def parse():
 
     parser.add_argument('-f', '--format',
                         type=str,
-                        help='output result in specified format, default is ' + OUTPUT_FORMAT_TEXT,
+                        help='output result in specified format: text, md, json, jsonl (or ndjson) or yaml, default is ' + OUTPUT_FORMAT_TEXT,
                         default=OUTPUT_FORMAT_TEXT)
 
     parser.add_argument('--output-fixes',
@@ -188,6 +266,18 @@ def parse():
                         action='store_true',
                         help='output files filtered out and curations')
 
+    parser.add_argument('--append-summary',
+                        dest='append_summary',
+                        action='store_true',
+                        help='output a summary record after the files (jsonl format)',
+                        default=False)
+
+    parser.add_argument('--append-fixes',
+                        dest='append_fixes',
+                        action='store_true',
+                        help='output a record with files filtered out and curations after the files (jsonl format)',
+                        default=False)
+
     parser.add_argument('--version', '-V',
                         action='version',
                         version="{name}: {version}".format(name=scarfer_name, version=scarfer_version))
@@ -264,6 +354,8 @@ def _output_config(args):
         "include_file_file": args.include_file_file,
         "include_license": args.include_license,
         "include_copyright": args.include_copyright,
+        "query": args.query,
+        "exclude_query": args.exclude_query,
         #        "license": args.license,
         #        "license_summary": args.license_summary,
         #        "matched_text": args.matched_text
@@ -286,6 +378,7 @@ def _read_config(config_file, args):
         with open(config_file) as conf:
             confs = json.load(conf)
     elif cfile_lower.endswith('.yml') or cfile_lower.endswith('.yaml'):
+        import yaml
         new_args['file_matcher'] = 'fnmatch'
         with open(config_file) as conf:
             conf = yaml.safe_load(conf)
@@ -304,34 +397,19 @@ def _read_config(config_file, args):
 
     return new_args
 
-def main():
-
-    args = parse()
-
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
-
-    if args.output_config:
-        print(_output_config(args))
-        sys.exit(0)
-
-    args = _read_config(args.read_config, args)
-
-    # Create scan report reader
-    reader = ScanReportReader(args['file'])
-
-    # Get a normalized report
-    try:
-        normalized_report = reader.read()
-    except Exception as e:
-        logging.error(f'Could not read scan report file: {reader.report_file()}')
-        logging.error(f'Cause: {e}')
-        sys.exit(0)
-    if args['normalize']:
-        reader.validate()
-        print(json.dumps(normalized_report, indent=4))
-        sys.exit(0)
-
+def _report_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                file_name = os.path.join(path, name)
+                if os.path.isfile(file_name) and REPORT_FILE_RE.search(name.lower()):
+                    files.append(file_name)
+        else:
+            files.append(path)
+    return files
+
+def _create_filters(args):
     include_license = flatten_lists(args['include_license'])
     exclude_license = flatten_lists(args['exclude_license'])
     include_copyright = flatten_lists(args['include_copyright'])
@@ -339,28 +417,25 @@ def main():
     # exclude_file = flatten_lists(args['exclude_file)
     # Create filters
     include_files = _merge_file_filters(args['include_file'], args['include_file_file'])
-    filters = create_filters(include_license, include_copyright, include_files)
+    filters = create_filters(include_license, include_copyright, include_files, args['query'])
 
-    if args['disable_default_excludes']:
-        pass
-    else:
-        args['exclude_file_file'].append([DEFAULT_FILE_EXCLUDE_FILE])
-    exclude_files = _merge_file_filters(args['exclude_file'], args['exclude_file_file'])
-    exclude_filters = create_filters(exclude_license, exclude_copyright, exclude_files)
+    exclude_file_file = list(args['exclude_file_file'])
+    if not args['disable_default_excludes']:
+        exclude_file_file.append([DEFAULT_FILE_EXCLUDE_FILE])
+    exclude_files = _merge_file_filters(args['exclude_file'], exclude_file_file)
+    exclude_filters = create_filters(exclude_license, exclude_copyright, exclude_files, args['exclude_query'])
 
-    #    print(f"include_files:   {include_files}")
-    # print(f"include_filters: {filters}")
-    #    print(f"exclude_files:   {exclude_files}")
-    # print(f"exclude_filters: {exclude_filters}")
+    return filters, exclude_filters
 
-    # Create output formatter
-    formatter = FormatFactory.formatter(args['format'])
+def _create_settings(args, batch=False):
+    return Settings(args['copyrights'], args['license'], args['matched_text'], args['cumulative'], args['license_summary'], args['copyright_summary'], args['simplify'],
+                    args['append_summary'], args['append_fixes'], batch)
 
-    # Create settings map, to pass to apply_filter
-    settings = Settings(args['copyrights'], args['license'], args['matched_text'], args['cumulative'], args['license_summary'], args['copyright_summary'], args['simplify'])
+def _analyze(normalized_report, args):
+    filters, exclude_filters = _create_filters(args)
 
     # Filter the data in the report, with the filters
-    analyzer = Analyzer(normalized_report, file_matcher=args['file_matcher'])
+    analyzer = Analyzer(normalized_report, file_matcher=args['file_matcher'], dedup=args['dedup'] or args['grouped'])
     analyzer.apply_filters(filters, exclude_filters)
 
     #
@@ -369,33 +444,246 @@ def main():
     if args['curate_missing_license']:
         analyzer.curate_missing_license(args['curate_missing_license'])
     if args['curate_file_license']:
+        curations = []
         for curation in args["curate_file_license"]:
             length = len(curation)
             nr_files = length - 1
             curated_license = curation[nr_files]
             files = curation[0:nr_files]
-            analyzer.curate_file_license(files, curated_license)
+            curations.append((files, curated_license))
+        analyzer.curate_file_licenses(curations)
+
+    return analyzer
 
+def _write(formatter, analyzer, args, settings, out):
     filtered_files = analyzer.report()
 
-    # Format the data
+    # Format the data, written to out as it is formatted
     if args['copyright_summary'] or args['license_summary']:
-        formatted_data_list = []
         if args['copyright_summary']:
-            formatted_data_list.append(formatter.format_copyright_summary(filtered_files, settings))
+            formatter.write_copyright_summary(out, filtered_files, settings)
         if args['license_summary']:
-            formatted_data_list.append(formatter.format_license_summary(filtered_files, settings))
-        formatted_data = "\n".join(formatted_data_list)
-
+            formatter.write_license_summary(out, filtered_files, settings)
     elif args['cumulative']:
-        formatted_data = formatter.format_cumulative(filtered_files, settings)
+        formatter.write_cumulative(out, filtered_files, settings)
     elif args['output_fixes']:
-        formatted_data = formatter.format_fixes(analyzer.fixes(), settings)
+        formatter.write_fixes(out, analyzer.fixes(), settings)
+    elif args['grouped']:
+        formatter.write_groups(out, analyzer.grouped(), settings)
     else:
-        formatted_data = formatter.format(filtered_files, settings)
+        formatter.write(out, filtered_files, settings)
 
-    # Print the data
-    print(formatted_data)
+def _required_fields(formatter, settings, args, batch):
+    # the fields of the normalized files needed for output and filters
+    if args['normalize']:
+        return ALL_FIELDS
+    fields = set(formatter.fields(settings))
+    if args['include_copyright'] or args['exclude_copyright'] or batch:
+        fields.add(FIELD_COPYRIGHTS)
+    for query in args['query'] + args['exclude_query']:
+        fields.update(Query(query).fields())
+    if args['diff']:
+        fields.update([FIELD_HASHES, FIELD_COPYRIGHTS])
+    if args['dedup'] or args['grouped']:
+        fields.add(FIELD_HASHES)
+    return fields
+
+def _create_cache(args):
+    if not (args['cache'] or args['cache_dir']):
+        return None
+    from scarfer.cache import ReportCache
+    from scarfer.simplifier import MEMO_FILE_NAME
+    from scarfer.simplifier import use_memo_file
+    cache = ReportCache(args['cache_dir'], args['cache_size'] * 1024 * 1024)
+    # simplified licenses are remembered in the cache directory too
+    use_memo_file(os.path.join(cache.cache_dir, MEMO_FILE_NAME))
+    return cache
+
+def _read_error(reader, e):
+    logging.error(f'Could not read scan report file: {reader.report_file()}')
+    logging.error(f'Cause: {e}')
+
+def _process_report(file_name, args, out, batch=False):
+    # Read, analyze and write one scan report to out. In batch mode,
+    # this may be run in the worker processes.
+    if args['verbose']:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    # Create output formatter
+    formatter = FormatFactory.formatter(args['format'])
+
+    # Create settings map, to pass to apply_filter
+    settings = _create_settings(args, batch)
+
+    result = {
+        'file': file_name,
+        'read': False,
+        'licenses': [],
+        'copyrights': []
+    }
+
+    # Create scan report reader
+    cache = _create_cache(args)
+    # normalized files are kept as dicts when output as is
+    fields = _required_fields(formatter, settings, args, batch)
+    reader = ScanReportReader(file_name, cache, compact=not args['normalize'], fields=fields)
+
+    # Get a normalized report
+    try:
+        if args['stream']:
+            normalized_report = reader.read_stream()
+        else:
+            normalized_report = reader.read()
+    except Exception as e:
+        _read_error(reader, e)
+        return result
+    if args['normalize']:
+        reader.validate(max(1, args['validate_sample']))
+        # streamed files may turn out to be unreadable while written,
+        # so the report is written to a temporary file, not kept in
+        # memory, and copied to out when completely read
+        normalized_out = out
+        if args['stream']:
+            import tempfile
+            normalized_out = tempfile.TemporaryFile('w+')
+        try:
+            formatter.write_normalized(normalized_out, normalized_report, settings)
+            if normalized_out is not out:
+                import shutil
+                normalized_out.seek(0)
+                shutil.copyfileobj(normalized_out, out)
+        except ScanReportException as e:
+            _read_error(reader, e)
+            return result
+        finally:
+            if normalized_out is not out:
+                normalized_out.close()
+        result['read'] = True
+        return result
+
+    if args['diff']:
+        baseline_reader = ScanReportReader(args['diff'], cache, compact=True, fields=fields)
+        try:
+            baseline_report = baseline_reader.read()
+        except Exception as e:
+            logging.error(f'Could not read baseline scan report file: {baseline_reader.report_file()}')
+            logging.error(f'Cause: {e}')
+            return result
+        try:
+            delta = ReportDelta(baseline_report['files'], normalized_report['files'])
+        except ScanReportException as e:
+            _read_error(reader, e)
+            return result
+        baseline_analyzer = _analyze({'files': delta.baseline_files()}, args)
+        analyzer = _analyze({'files': delta.report_files()}, args)
+        delta.keep(baseline_analyzer.report()['files'], analyzer.report()['files'])
+        formatter.write_delta(out, delta.report(), settings)
+    else:
+        # streamed files are read when the analyzer is created
+        try:
+            analyzer = _analyze(normalized_report, args)
+        except ScanReportException as e:
+            _read_error(reader, e)
+            return result
+        _write(formatter, analyzer, args, settings, out)
+
+    if batch:
+        # for the summary of all reports
+        cumulative = analyzer.report()['cumulative']
+        result['licenses'] = cumulative.licenses()
+        result['copyrights'] = cumulative.copyrights()
+    result['read'] = True
+    return result
+
+def _buffered_process_report(file_name, args):
+    # as _process_report(), in a worker process, with the output
+    # returned in the result
+    out = io.StringIO()
+    result = _process_report(file_name, args, out, batch=True)
+    result['output'] = out.getvalue()
+    return result
+
+def _process_reports(formatter, files, args, out):
+    # write each report to out, between its header and footer, and
+    # yield the results
+    if args['jobs'] <= 1:
+        for index, file_name in enumerate(files):
+            formatter.write_report_header(out, file_name, index)
+            result = _process_report(file_name, args, out, batch=True)
+            formatter.write_report_footer(out, file_name)
+            yield result
+        return
+    import concurrent.futures
+    process_report = functools.partial(_buffered_process_report, args=args)
+    # map() keeps the order of the reports
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args['jobs']) as executor:
+        for index, result in enumerate(executor.map(process_report, files)):
+            formatter.write_report_header(out, result["file"], index)
+            out.write(result.pop('output'))
+            formatter.write_report_footer(out, result["file"])
+            yield result
+
+def _summary_report(results):
+    # a report with the reports as files, for the summary formatters
+    files = []
+    for result in results:
+        files.append({
+            'path': result['file'],
+            'copyrights': result['copyrights'],
+            'license': {
+                'expressions': result['licenses'],
+                'matches': []
+            }
+        })
+    return {'files': files}
+
+def _output(args, out):
+    files = _report_files(args['files'])
+    # a directory is output as many reports, even with one report
+    if len(args['files']) == 1 and not os.path.isdir(args['files'][0]):
+        _process_report(files[0], args, out)
+        return
+
+    formatter = FormatFactory.formatter(args['format'])
+    formatter.write_reports_header(out)
+    # reports not read are left out of the summary
+    results = [result for result in _process_reports(formatter, files, args, out) if result['read']]
+
+    summary_report = None
+    if not args['normalize']:
+        _create_cache(args)
+        summary_report = _summary_report(results)
+    formatter.write_reports_footer(out, len(results), summary_report, _create_settings(args))
+
+def main():
+
+    args = parse()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    if args.output_config:
+        print(_output_config(args))
+        sys.exit(0)
+
+    args = _read_config(args.read_config, args)
+
+    try:
+        for query in args['query'] + args['exclude_query']:
+            Query(query)
+    except QueryException as e:
+        logging.error(f'Invalid query: {e}')
+        sys.exit(1)
+
+    # the output is written as it is formatted
+    out = sys.stdout
+    try:
+        _output(args, out)
+    except BrokenPipeError:
+        # the output is read by a program that quit, e.g. head
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
 
 
 if __name__ == '__main__':
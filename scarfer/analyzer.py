@@ -2,11 +2,14 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import fnmatch
 import re
 from enum import Enum
-from license_expression import Licensing
 from scarfer.scan_interface import ScanReportException
+from scarfer.path_index import PathIndex
+from scarfer.matcher import compile_pattern
+from scarfer.cumulative import Cumulative
+from scarfer.dedup import ContentGroups
+from scarfer.query import Query
 
 class ScanReportFilterOperator(Enum):
     AND = 1
@@ -19,6 +22,7 @@ class ScanReportFilterType(Enum):
     FILE = 1
     LICENSE = 2
     COPYRIGHT = 3
+    QUERY = 4
 
     def __str__(self):
         return str(self.value)
@@ -28,6 +32,15 @@ class ScanReportFilter:
     def __init__(self, _expr, _type=ScanReportFilterType.FILE):
         self.expr = _expr
         self.type = _type
+        # license and copyright filters are regular expressions, compiled
+        # once, file filters are indexed by the analyzer (see
+        # path_index.py) since the file matcher is known there
+        self.regex = None
+        self.query = None
+        if self.type == ScanReportFilterType.QUERY:
+            self.query = Query(self.expr)
+        elif self.type != ScanReportFilterType.FILE:
+            self.regex = compile_pattern(self.expr)
 
     def __str__(self):
         return "expr: {_expr}, type: {_type}, ".format(
@@ -36,102 +49,150 @@ class ScanReportFilter:
 
 class Analyzer:
 
-    def __init__(self, report, file_matcher='re'):
+    def __init__(self, report, file_matcher='re', dedup=False):
         self.normaliazed_report = report
         self.data = report['files']
+        if not isinstance(self.data, list):
+            # files read with ScanReportReader.read_stream(), curations
+            # and repeated filtering need all normalized files
+            self.data = list(self.data)
         self.schema = None
         self.file_matcher = file_matcher
-
-    def _file_match(self, file_name, expr):
-        if self.file_matcher == 'fnmatch':
-            ret = fnmatch.fnmatch(file_name, expr)
-        else:
-            ret = expr in file_name
-        return ret
-
-    def _filter_match(self, filt, item):
-        if self.file_matcher == 'fnmatch':
-            ret = fnmatch.fnmatch(item, filt.expr)
-        else:
-            ret = re.search(filt.expr, item) is not None
-        return ret
-
-    def _apply_filter_file(self, filt, f):
-        if filt.type == ScanReportFilterType.FILE:
-            return self._filter_match(filt, f['path'])
-        elif filt.type == ScanReportFilterType.LICENSE:
-            if len(f['license']['expressions']) == 0:
-                if filt.expr == "missing":
-                    return True
+        # the indexes of file filters, by their expressions, built once
+        # when filtering repeatedly with the same file filters
+        self.path_indexes = {}
+        # files with identical content, see dedup.py, grouped by
+        # apply_filters() when dedup is set, or None
+        self.dedup = dedup
+        self.content_groups = None
+
+    def _file_filter_set(self, filters):
+        # all file filters indexed, so that a path is matched with one lookup
+        exprs = tuple([filt.expr for filt in filters])
+        path_index = self.path_indexes.get(exprs)
+        if path_index is None:
+            path_index = PathIndex(exprs, self.file_matcher == 'fnmatch')
+            self.path_indexes[exprs] = path_index
+        return filters, path_index
+
+    def _match_file_filters(self, filter_set, f):
+        # a file filter matching the path of f, or None
+        file_filters, path_index = filter_set
+        index = path_index.match(f['path'])
+        if index is None:
+            return None
+        return file_filters[index]
+
+    def _distinct_files(self):
+        # (file indexes, file) for the files, with files of the same
+        # content group once
+        if self.content_groups is None:
+            return [([file_index], f) for file_index, f in enumerate(self.data)]
+        return [(group.indexes, group.files[0]) for group in self.content_groups]
+
+    def _value_index(self, filter_type):
+        # the files by license expression, or by copyright, with None
+        # for files without license expressions
+        index = {}
+        for file_indexes, f in self._distinct_files():
+            if filter_type == ScanReportFilterType.LICENSE:
+                values = f['license']['expressions']
+                if len(values) == 0:
+                    values = [None]
+            elif filter_type == ScanReportFilterType.COPYRIGHT:
+                values = f['copyrights']
             else:
-                for le in f['license']['expressions']:
-                    if re.search(filt.expr, le):
-                        return True
-            return False
-        elif filt.type == ScanReportFilterType.COPYRIGHT:
-            for cop in f['copyrights']:
-                if re.search(filt.expr, cop):
-                    return True
-            return False
-        else:
-            raise ScanReportException("Unsupported filter type. This is weird.")
-
-    def _apply_filters_file(self, f, filters, filter_on_files):
-
-        if len(filters) == 0:
-            return True
-
-        ret = False
-
+                raise ScanReportException("Unsupported filter type. This is weird.")
+            for value in values:
+                index.setdefault(value, []).extend(file_indexes)
+        return index
+
+    def _value_match(self, filt, value):
+        if value is None:
+            return filt.expr == "missing"
+        return filt.regex.search(value) is not None
+
+    def _first_value_filters(self, filters, value_indexes):
+        # The first license or copyright filter matching each file. Each
+        # filter is matched once per license expression, or copyright,
+        # instead of once per file.
+        first = [None] * len(self.data)
+        for filt in reversed(filters):
+            if filt.type not in value_indexes:
+                value_indexes[filt.type] = self._value_index(filt.type)
+            for value, file_indexes in value_indexes[filt.type].items():
+                if self._value_match(filt, value):
+                    for file_index in file_indexes:
+                        first[file_index] = filt
+        return first
+
+    def _match_query_filters(self, filters, f):
+        # the first query filter matching f, or None
         for filt in filters:
-            if filter_on_files:
-                if filt.type == ScanReportFilterType.FILE:
-                    ret = ret or self._apply_filter_file(filt, f)
+            if filt.query.matches(f):
+                return filt
+        return None
+
+    def _filter_steps(self, filters, exclude_filters):
+        # The filters in the order they are applied: include on files,
+        # include on licenses and copyrights, include on queries, and
+        # the same for excludes. Steps without filters are left out.
+        steps = []
+        value_indexes = {}
+        for clude_filters, include in [(filters, True), (exclude_filters, False)]:
+            file_filters = [filt for filt in clude_filters if filt.type == ScanReportFilterType.FILE]
+            if file_filters:
+                steps.append((len(steps), include, [ScanReportFilterType.FILE], 'file', self._file_filter_set(file_filters)))
+            value_filters = [filt for filt in clude_filters if filt.type in [ScanReportFilterType.LICENSE, ScanReportFilterType.COPYRIGHT]]
+            if value_filters:
+                filter_types = sorted(set([filt.type for filt in value_filters]), key=lambda t: t.value)
+                steps.append((len(steps), include, filter_types, 'value', self._first_value_filters(value_filters, value_indexes)))
+            query_filters = [filt for filt in clude_filters if filt.type == ScanReportFilterType.QUERY]
+            if query_filters:
+                for filt in query_filters:
+                    filt.query.plan(self.data)
+                steps.append((len(steps), include, [ScanReportFilterType.QUERY], 'query', query_filters))
+        return steps
+
+    def _exclusion(self, file_index, f, steps):
+        # (step, reason) for the first filter step excluding f, or None
+        # if f is kept
+        for step, include, filter_types, kind, step_filters in steps:
+            if kind == 'file':
+                filt = self._match_file_filters(step_filters, f)
+            elif kind == 'value':
+                filt = step_filters[file_index]
             else:
-                if filt.type == ScanReportFilterType.LICENSE or filt.type == ScanReportFilterType.COPYRIGHT:
-                    ret = ret or self._apply_filter_file(filt, f)
-
-        return ret
-
-    def _generic_filter_count(self, filters, filter_type):
-        count = 0
-        for filt in filters:
-            if filt.type == filter_type:
-                count += 1
-        return count
-
-    def _file_filter_count(self, filters):
-        return self._generic_filter_count(filters, ScanReportFilterType.FILE)
-
-    def _license_filter_count(self, filters):
-        return self._generic_filter_count(filters, ScanReportFilterType.LICENSE)
-
-    def _copyright_filter_count(self, filters):
-        return self._generic_filter_count(filters, ScanReportFilterType.COPYRIGHT)
-
-    def __licenses_simplified(self, files):
-        licenses = set()
-        for f in files:
-            for lic in f['license']['expressions']:
-                licenses.add(lic)
-
-        licenses_with_parenthesises = []
-        for le in licenses:
-            licenses_with_parenthesises.append(f' ( {le} )') # noqa: E201, E202
-        # print(f"\nlic par:     {licenses_with_parenthesises}")
-        license_string = " and ".join(licenses_with_parenthesises)
-        licensing = Licensing()
-        parsed = licensing.parse(license_string)
-        if parsed is None:
-            simplified = parsed
-        else:
-            simplified = parsed.simplify()
-        return simplified
+                filt = self._match_query_filters(step_filters, f)
+            if include and filt is None:
+                return step, {
+                    'file': f['path'],
+                    'reason': 'not included',
+                    'type': " or ".join([t.name.lower() for t in filter_types]),
+                    'filter': None
+                }
+            if not include and filt is not None:
+                return step, {
+                    'file': f['path'],
+                    'reason': 'excluded',
+                    'type': filt.type.name.lower(),
+                    'filter': filt.expr
+                }
+        return None
+
+    def _curate(self, f, license, expressions):
+        # set the expressions of f, keeping the cumulative license of the
+        # report up to date
+        cumulative = self.report_data['cumulative']
+        if id(f) in self.kept:
+            cumulative.remove(license['expressions'])
+            cumulative.add(expressions)
+        license['expressions'] = expressions
 
     def curate_missing_license(self, curated_license):
         for f in self.data:
             if f['license']['expressions'] == ['missing']:
-                f['license']['expressions'] = curated_license
+                self._curate(f, f['license'], curated_license)
                 self.report_data['fixes']['missing_license'].append(
                     {
                         'file': f['path'],
@@ -139,70 +200,72 @@ class Analyzer:
                     }
                 )
 
-        self.report_data['cumulative']['license'] = self.__licenses_simplified(self.report_data['files'])
+    def _curation_index(self, patterns):
+        # curated files are fnmatch patterns, or strings found in paths
+        if self.file_matcher == 'fnmatch':
+            return PathIndex(patterns, True)
+        return PathIndex([re.escape(pattern) for pattern in patterns])
+
+    def curate_file_licenses(self, curations):
+        # Curate the license of files, with curations as a list of
+        # (files, curated license). Same as calling curate_file_license
+        # for each curation, but with one pass over the files.
+        patterns = []
+        licenses = []
+        for files, curated_license in curations:
+            for curated_file in files:
+                patterns.append(curated_file)
+                licenses.append(curated_license)
+        curation_index = self._curation_index(patterns)
+
+        curated = [[] for pattern in patterns]
+        for f in self.data:
+            path = f['path']
+            indexes = curation_index.match_all(path)
+            if not indexes:
+                continue
+            license = f['license']
+            expressions = license['expressions']
+            for index in indexes:
+                orig = expressions
+                expressions = [licenses[index]]
+                curated[index].append(
+                    {
+                        'file': path,
+                        'curation': licenses[index],
+                        'original': orig
+                    }
+                )
+            self._curate(f, license, expressions)
+
+        # in the order of the curations, as if curated one by one
+        for curated_files in curated:
+            self.report_data['fixes']['curated_licenses'].extend(curated_files)
 
     def curate_file_license(self, files, curated_license):
-        for curated_file in files:
-            for f in self.data:
-                if self._file_match(f['path'], curated_file):
-                    orig = f['license']['expressions']
-                    f['license']['expressions'] = [curated_license]
-                    self.report_data['fixes']['curated_licenses'].append(
-                        {
-                            'file': f['path'],
-                            'curation': curated_license,
-                            'original': orig
-                        }
-                    )
-
-        self.report_data['cumulative']['license'] = self.__licenses_simplified(self.report_data['files'])
+        self.curate_file_licenses([(files, curated_license)])
 
     def apply_filters(self, filters=[], exclude_filters=[], package=""):
 
-        # filter in on files
-        if self._file_filter_count(filters) > 0:
-            keep_data = []
-            discard_data = []
-            for f in self.data:
-                # print("f: " + str(f['path']))
-                if not self._apply_filters_file(f, filters, True):
-                    discard_data.append(f)
-                else:
-                    keep_data.append(f)
-        else:
-            keep_data = self.data
-            discard_data = []
-
-        # filter in on licenses and copyright
-        if self._license_filter_count(filters) > 0 or self._copyright_filter_count(filters) > 0:
-            ret_data = []
-            for f in keep_data:
-                if not self._apply_filters_file(f, filters, False):
-                    discard_data.append(f)
-                else:
-                    ret_data.append(f)
-            keep_data = ret_data
-
-        # filter out on files
-        if self._file_filter_count(exclude_filters) > 0:
-            ret_data = []
-            for f in keep_data:
-                if not self._apply_filters_file(f, exclude_filters, True):
-                    ret_data.append(f)
-                else:
-                    discard_data.append(f)
-            keep_data = ret_data
-
-        # filter out on licenses
-        if self._license_filter_count(exclude_filters) > 0 or self._copyright_filter_count(exclude_filters) > 0:
-            ret_data = []
-            for f in keep_data:
-                if not self._apply_filters_file(f, exclude_filters, False):
-                    ret_data.append(f)
-                else:
-                    discard_data.append(f)
-
-            keep_data = ret_data
+        # Grouped again for each filtering, since curations and missing
+        # licenses change the scan results of files after grouping.
+        if self.dedup:
+            self.content_groups = ContentGroups(self.data)
+
+        # Decide, in one pass, if a file is kept. Excluded files are
+        # listed by the step excluding them, as if each step was a pass.
+        steps = self._filter_steps(filters, exclude_filters)
+        keep_data = []
+        discarded = [[] for step in steps]
+        for file_index, f in enumerate(self.data):
+            exclusion = self._exclusion(file_index, f, steps)
+            if exclusion is None:
+                keep_data.append(f)
+            else:
+                step, reason = exclusion
+                discarded[step].append((f, reason))
+        discarded = [item for step_discarded in discarded for item in step_discarded]
+        discard_data = [f for f, reason in discarded]
 
         for f in keep_data:
             # If no license identified, mark as missing
@@ -213,16 +276,21 @@ class Analyzer:
         report_data['files'] = keep_data
         report_data['fixes'] = {}
         report_data['fixes']['excluded_files'] = discard_data
+        report_data['fixes']['exclusions'] = [reason for f, reason in discarded]
         report_data['fixes']['missing_license'] = []
         report_data['fixes']['curated_licenses'] = []
         report_data['meta'] = {}
-        report_data['cumulative'] = {}
-        report_data['cumulative']['license'] = self.__licenses_simplified(keep_data)
+        report_data['cumulative'] = Cumulative(keep_data)
         self.report_data = report_data
+        self.kept = set([id(f) for f in keep_data])
 
     def report(self):
         return self.report_data
 
+    def grouped(self):
+        # the kept files grouped by content, see dedup.py
+        return ContentGroups(self.report_data['files']).report()
+
     def fixes(self):
         if self.report_data is None:
             self.apply_filters()
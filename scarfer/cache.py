@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+from scarfer.config import DEFAULT_CACHE_SIZE
+from scarfer.config import scarfer_name
+from scarfer.config import scarfer_version
+
+DIGEST_CHUNK_SIZE = 1 << 20
+
+def default_cache_dir():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, scarfer_name)
+
+def _hash(*values):
+    return hashlib.sha256(":".join([str(v) for v in values]).encode('utf-8')).hexdigest()
+
+def file_digest(file_name):
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(DIGEST_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Cache of normalized reports, stored as pickle files in the "data"
+# directory and named after the content digest of the scan report.
+#
+# The "index" directory maps path, size and modification time of a
+# scan report to its data file, so the scan report only needs to be
+# digested when it is new or has been touched. Data files are evicted,
+# least recently used first, when their total size exceeds max_size.
+class ReportCache:
+
+    def __init__(self, cache_dir=None, max_size=DEFAULT_CACHE_SIZE):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_size = max_size
+        self.index_dir = os.path.join(self.cache_dir, "index")
+        self.data_dir = os.path.join(self.cache_dir, "data")
+
+    def _index_file(self, file_name, variant):
+        stat = os.stat(file_name)
+        key = _hash(os.path.realpath(file_name), stat.st_size, stat.st_mtime_ns, variant, scarfer_version)
+        return os.path.join(self.index_dir, key)
+
+    def _data_file(self, digest, variant):
+        return os.path.join(self.data_dir, _hash(digest, variant, scarfer_version) + ".pickle")
+
+    def _write(self, file_name, content):
+        directory = os.path.dirname(file_name)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(content)
+            os.replace(tmp_file, file_name)
+        except Exception:
+            os.remove(tmp_file)
+            raise
+
+    def _lookup(self, index_file):
+        try:
+            with open(index_file) as fp:
+                data_file = os.path.join(self.data_dir, fp.read().strip())
+        except FileNotFoundError:
+            return None
+        if os.path.exists(data_file):
+            return data_file
+        os.remove(index_file)
+        return None
+
+    def _load(self, data_file):
+        with open(data_file, 'rb') as fp:
+            data = pickle.load(fp)
+        # mark as recently used
+        os.utime(data_file)
+        return data
+
+    def evict(self):
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.data_dir):
+            stat = os.stat(os.path.join(self.data_dir, name))
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+            total_size += stat.st_size
+
+        removed = set()
+        for mtime, size, name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            os.remove(os.path.join(self.data_dir, name))
+            removed.add(name)
+            total_size -= size
+
+        if removed:
+            for name in os.listdir(self.index_dir):
+                index_file = os.path.join(self.index_dir, name)
+                with open(index_file) as fp:
+                    if fp.read().strip() in removed:
+                        os.remove(index_file)
+
+    def _store(self, index_file, data_file, data):
+        try:
+            self._write(data_file, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+            self._write(index_file, os.path.basename(data_file).encode('utf-8'))
+            self.evict()
+        except OSError as e:
+            logging.debug(f'Could not store {data_file} in cache: {e}')
+
+    def load(self, file_name, variant, read_function):
+        # Return the cached result of read_function() for file_name, or
+        # call read_function() and cache its result. The variant
+        # identifies the options affecting the result.
+        try:
+            index_file = self._index_file(file_name, variant)
+            data_file = self._lookup(index_file)
+            if data_file is None:
+                data_file = self._data_file(file_digest(file_name), variant)
+                if os.path.exists(data_file):
+                    self._write(index_file, os.path.basename(data_file).encode('utf-8'))
+            if os.path.exists(data_file):
+                logging.debug(f'Reading {file_name} from cache {data_file}')
+                return self._load(data_file)
+        except (OSError, pickle.PickleError, EOFError) as e:
+            logging.debug(f'Could not use cache for {file_name}: {e}')
+            return read_function()
+
+        data = read_function()
+        self._store(index_file, data_file, data)
+        return data
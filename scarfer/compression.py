@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Transparent, streamed, decompression of scan reports. The compression
+# is detected from the first bytes of a file, not from its name. The
+# decompression modules are imported when needed.
+
+import io
+
+GZIP = "gzip"
+XZ = "xz"
+BZIP2 = "bz2"
+ZSTD = "zstd"
+
+MAGIC_NUMBERS = [
+    (b'\x1f\x8b', GZIP),
+    (b'\xfd7zXZ\x00', XZ),
+    (b'BZh', BZIP2),
+    (b'\x28\xb5\x2f\xfd', ZSTD),
+]
+MAGIC_SIZE = max([len(magic) for magic, compression in MAGIC_NUMBERS])
+
+class CompressionException(Exception):
+
+    def __init__(self, message=""):
+        self.message = message
+        super().__init__(self.message)
+
+def compression(file_name):
+    # the compression of the file, None if not compressed
+    with open(file_name, 'rb') as fp:
+        start = fp.read(MAGIC_SIZE)
+    for magic, compression in MAGIC_NUMBERS:
+        if start.startswith(magic):
+            return compression
+    return None
+
+def open_binary(file_name):
+    used_compression = compression(file_name)
+    if used_compression is None:
+        return open(file_name, 'rb')
+    if used_compression == GZIP:
+        import gzip
+        return gzip.open(file_name, 'rb')
+    if used_compression == XZ:
+        import lzma
+        return lzma.open(file_name, 'rb')
+    if used_compression == BZIP2:
+        import bz2
+        return bz2.open(file_name, 'rb')
+    try:
+        import zstandard
+    except ImportError:
+        raise CompressionException(f'File {file_name} is compressed with zstd, which requires the zstandard module')
+    reader = zstandard.ZstdDecompressor().stream_reader(open(file_name, 'rb'), read_across_frames=True, closefd=True)
+    return io.BufferedReader(reader)
+
+def open_text(file_name, errors=None):
+    if compression(file_name) is None:
+        return open(file_name, errors=errors)
+    return io.TextIOWrapper(open_binary(file_name), encoding='utf-8', errors=errors)
@@ -10,3 +10,5 @@ scarfer_name = "scarfer"
 TOP_DIR = os.path.dirname(os.path.realpath(__file__))
 VAR_DIR = os.path.join(TOP_DIR, "var")
 DEFAULT_FILE_EXCLUDE_FILE = os.path.join(VAR_DIR, "default-exclude-files.txt")
+
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024
@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from collections import Counter
+from collections.abc import Mapping
+
+# created when first used, license_expression is slow to import
+LICENSING = None
+
+# parsed license expressions, by expression
+PARSED = {}
+
+# simplified licenses, by the set of expressions
+SIMPLIFIED = {}
+
+def licensing():
+    global LICENSING
+    if LICENSING is None:
+        from license_expression import Licensing
+        LICENSING = Licensing()
+    return LICENSING
+
+def parse(expression):
+    parsed = PARSED.get(expression)
+    if parsed is None:
+        parsed = licensing().parse(f' ( {expression} )') # noqa: E201, E202
+        PARSED[expression] = parsed
+    return parsed
+
+def simplify(expressions):
+    # the simplified license of all expressions combined with "and"
+    expressions = frozenset(expressions)
+    if expressions not in SIMPLIFIED:
+        parsed = [parse(expression) for expression in expressions]
+        parsed = [p for p in parsed if p is not None]
+        if len(parsed) == 0:
+            simplified = None
+        elif len(parsed) == 1:
+            simplified = parsed[0].simplify()
+        else:
+            simplified = licensing().AND(*parsed).simplify()
+        SIMPLIFIED[expressions] = simplified
+    return SIMPLIFIED[expressions]
+
+
+# The cumulative information of the files in a report, as in
+# report['cumulative'], shared by the summaries of all formatters. The
+# files are counted per license expression, and per copyright, in one
+# pass when first read. The license counts are then updated as files
+# are curated, so the cumulative license is only simplified when read.
+class Cumulative(Mapping):
+
+    KEYS = ('license',)
+
+    def __init__(self, files=[]):
+        self.files = files
+        self.counted = False
+        self.license_counts = Counter()
+        self.copyright_counts = Counter()
+
+    def _count(self):
+        if not self.counted:
+            for f in self.files:
+                self.license_counts.update(set(f['license']['expressions']))
+                self.copyright_counts.update(set(f['copyrights']))
+            self.counted = True
+
+    def add(self, expressions):
+        if self.counted:
+            self.license_counts.update(set(expressions))
+
+    def remove(self, expressions):
+        if not self.counted:
+            return
+        self.license_counts.subtract(set(expressions))
+        for expression in set(expressions):
+            if self.license_counts[expression] <= 0:
+                del self.license_counts[expression]
+
+    def licenses(self):
+        # the license expressions of the files, sorted
+        self._count()
+        return sorted(self.license_counts)
+
+    def copyrights(self):
+        # the copyrights of the files, sorted
+        self._count()
+        return sorted(self.copyright_counts)
+
+    def files_per_license(self):
+        self._count()
+        return self.license_counts
+
+    def files_per_copyright(self):
+        self._count()
+        return self.copyright_counts
+
+    def license(self):
+        self._count()
+        return simplify(self.license_counts)
+
+    def __getitem__(self, key):
+        if key == 'license':
+            return self.license()
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def report_cumulative(report):
+    # the cumulative information of report, created once for reports
+    # not created by the Analyzer
+    if 'cumulative' not in report:
+        report['cumulative'] = Cumulative(report['files'])
+    return report['cumulative']
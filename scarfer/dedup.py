@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Files with identical content, e.g. the same LICENSE or config.guess
+# vendored in many directories, grouped by content hash. The files in a
+# group have the same scan results, so filters on licenses and
+# copyrights are matched once per group and the groups can be output
+# with the scan results once, followed by the paths of the files.
+#
+# Files without hashes, and files with the same hash but different
+# scan results (e.g. curated), are not grouped together.
+
+HASH_KEYS = ('sha1', 'sha256', 'md5')
+
+def content(f):
+    # (hash type, hash) of the content of f, or None
+    for key in HASH_KEYS:
+        if f[key]:
+            return key, f[key].lower()
+    return None
+
+def _scan_results(f):
+    license = f['license']
+    return (tuple(license['expressions']),
+            tuple(f['copyrights']),
+            tuple([(m['key'], m['text']) for m in license['matches']]))
+
+
+class ContentGroup:
+
+    def __init__(self, content, file_index, f):
+        self.content = content
+        self.indexes = [file_index]
+        self.files = [f]
+
+    def add(self, file_index, f):
+        self.indexes.append(file_index)
+        self.files.append(f)
+
+    def report(self):
+        f = self.files[0]
+        return {
+            'sha1': f['sha1'],
+            'md5': f['md5'],
+            'sha256': f['sha256'],
+            'paths': [f['path'] for f in self.files],
+            'copyrights': f['copyrights'],
+            'license': f['license']
+        }
+
+
+class ContentGroups:
+
+    def __init__(self, files):
+        # the groups in the order of their first file
+        self.groups = []
+        # groups by content and scan results, with the scan results of
+        # the first file with a content (None) only read if another
+        # file has the same content
+        by_content = {}
+        for file_index, f in enumerate(files):
+            key = content(f)
+            if key is None:
+                self._group(None, file_index, f)
+                continue
+            same_content = by_content.get(key)
+            if same_content is None:
+                by_content[key] = {None: self._group(key, file_index, f)}
+                continue
+            if None in same_content:
+                group = same_content.pop(None)
+                same_content[_scan_results(group.files[0])] = group
+            scan_results = _scan_results(f)
+            group = same_content.get(scan_results)
+            if group is None:
+                same_content[scan_results] = self._group(key, file_index, f)
+            else:
+                group.add(file_index, f)
+
+    def _group(self, key, file_index, f):
+        group = ContentGroup(key, file_index, f)
+        self.groups.append(group)
+        return group
+
+    def report(self):
+        return [group.report() for group in self.groups]
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def __len__(self):
+        return len(self.groups)
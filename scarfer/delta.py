@@ -0,0 +1,120 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Differences between a baseline report and a (newer) report, e.g. of
+# the same source code scanned before and after an update.
+#
+# The normalized files of the reports are joined on path, and files
+# only found in one of the reports are joined on content hash (moved
+# files). Files with the same path, content, license expressions and
+# copyrights are unchanged and left out, so that only the remaining
+# files need to be analyzed.
+
+from scarfer.dedup import HASH_KEYS
+from scarfer.dedup import content
+
+def _same_content(baseline_file, report_file):
+    for key in HASH_KEYS:
+        if baseline_file[key] and report_file[key]:
+            return baseline_file[key].lower() == report_file[key].lower()
+    # without hashes, only the scan results can be compared
+    return True
+
+def _same(baseline_file, report_file):
+    return (baseline_file['path'] == report_file['path'] and
+            _same_content(baseline_file, report_file) and
+            baseline_file['license']['expressions'] == report_file['license']['expressions'] and
+            baseline_file['copyrights'] == report_file['copyrights'])
+
+
+class ReportDelta:
+
+    def __init__(self, baseline_files, report_files):
+        self.added = []
+        self.removed = []
+        # (baseline file, report file) for changed and moved files
+        self.changed = []
+        self._join(baseline_files, report_files)
+
+    def _join(self, baseline_files, report_files):
+        # reports should not, but may, have many files with the same path
+        baseline = {}
+        for f in baseline_files:
+            baseline.setdefault(f['path'], []).append(f)
+
+        added = []
+        for f in report_files:
+            same_path = baseline.get(f['path'])
+            if not same_path:
+                added.append(f)
+                continue
+            baseline_file = same_path.pop(0)
+            if not _same(baseline_file, f):
+                self.changed.append((baseline_file, f))
+        not_joined = [f for same_path in baseline.values() for f in same_path]
+
+        # files only in one of the reports, with the same content
+        removed = {}
+        for f in not_joined:
+            removed.setdefault(content(f), []).append(f)
+        removed.pop(None, None)
+        for f in added:
+            moved_from = removed.get(content(f))
+            if moved_from:
+                self.changed.append((moved_from.pop(0), f))
+            else:
+                self.added.append(f)
+        moved = set([id(baseline_file) for baseline_file, f in self.changed])
+        self.removed = [f for f in not_joined if id(f) not in moved]
+
+    def baseline_files(self):
+        # the files of the baseline report to analyze
+        return self.removed + [baseline_file for baseline_file, f in self.changed]
+
+    def report_files(self):
+        # the files of the report to analyze
+        return self.added + [f for baseline_file, f in self.changed]
+
+    def keep(self, baseline_files, report_files):
+        # Keep only the analyzed (filtered and curated) files. A file only
+        # kept in one of the reports is added, or removed, and changed
+        # files may be unchanged after curation.
+        baseline_kept = set([id(f) for f in baseline_files])
+        report_kept = set([id(f) for f in report_files])
+        self.added = [f for f in self.added if id(f) in report_kept]
+        self.removed = [f for f in self.removed if id(f) in baseline_kept]
+        changed = []
+        for baseline_file, f in self.changed:
+            if id(baseline_file) in baseline_kept and id(f) in report_kept:
+                if not _same(baseline_file, f):
+                    changed.append((baseline_file, f))
+            elif id(f) in report_kept:
+                self.added.append(f)
+            elif id(baseline_file) in baseline_kept:
+                self.removed.append(baseline_file)
+        self.changed = changed
+
+    def _changed(self, baseline_file, f):
+        baseline_copyrights = set(baseline_file['copyrights'])
+        copyrights = set(f['copyrights'])
+        return {
+            'path': f['path'],
+            'baseline_path': baseline_file['path'],
+            'content_changed': not _same_content(baseline_file, f),
+            'licenses': {
+                'baseline': baseline_file['license']['expressions'],
+                'report': f['license']['expressions']
+            },
+            'copyrights': {
+                'added': sorted(copyrights - baseline_copyrights),
+                'removed': sorted(baseline_copyrights - copyrights)
+            }
+        }
+
+    def report(self):
+        return {
+            'added': self.added,
+            'removed': self.removed,
+            'changed': [self._changed(baseline_file, f) for baseline_file, f in self.changed]
+        }
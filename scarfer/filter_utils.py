@@ -17,7 +17,10 @@ def _create_copyright_filter(expr):
 def _create_file_filter(expr):
     return _create_filter(expr, ScanReportFilterType.FILE)
 
-def create_filters(license_filter, copyright_filter, file_filter):
+def _create_query_filter(expr):
+    return _create_filter(expr, ScanReportFilterType.QUERY)
+
+def create_filters(license_filter, copyright_filter, file_filter, query_filter=[]):
     filters = []
     for lf in license_filter:
         filters.append(_create_license_filter(lf))
@@ -27,4 +30,7 @@ def create_filters(license_filter, copyright_filter, file_filter):
 
     for ff in file_filter:
         filters.append(_create_file_filter(ff))
+
+    for qf in query_filter:
+        filters.append(_create_query_filter(qf))
     return filters
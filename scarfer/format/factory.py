@@ -2,21 +2,24 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from scarfer.format.format_json import JsonFormatter
-from scarfer.format.format_yaml import YamlFormatter
-from scarfer.format.format_text import TextFormatter
-from scarfer.format.format_markdown import MarkdownFormatter
-
-
+# The formatter modules are imported when used, e.g. yaml is only
+# imported for YAML output.
 class FormatFactory:
 
     @staticmethod
     def formatter(format):
         if format.lower() == "json":
+            from scarfer.format.format_json import JsonFormatter
             return JsonFormatter()
+        elif format.lower() == "jsonl" or format.lower() == "ndjson":
+            from scarfer.format.format_jsonl import JsonLinesFormatter
+            return JsonLinesFormatter()
         elif format.lower() == "yaml" or format.lower() == "yaml":
+            from scarfer.format.format_yaml import YamlFormatter
             return YamlFormatter()
         elif format.lower() == "text" or format.lower() == "txt":
+            from scarfer.format.format_text import TextFormatter
             return TextFormatter()
         elif format.lower() == "markdown" or format.lower() == "md":
+            from scarfer.format.format_markdown import MarkdownFormatter
             return MarkdownFormatter()
@@ -4,32 +4,124 @@
 
 import json
 
+from scarfer.cumulative import report_cumulative
 from scarfer.format.interface import FormatInterface
+from scarfer import json_backend
+from scarfer.records import to_dict
+
+INDENT = 4
+
+# Many reports are written as one JSON object, with the output of each
+# report as members of an object in "reports":
+#
+#    {
+#        "reports": [
+#            {
+#                "file": "scan.json",
+#                "files": [...]
+#            }
+#        ],
+#        "summary": {"reports": 1, "license": ..., "copyrights": [...]}
+#    }
+REPORT_LEVEL = 3
+
+def _indentation(level):
+    return '\n' + ' ' * INDENT * level
 
 class JsonFormatter(FormatInterface):
 
+    def _write_json(self, out, key, obj, depth, settings):
+        if settings.get('batch'):
+            # a member of the report object, see write_report_header
+            out.write(f',{_indentation(REPORT_LEVEL)}{json_backend.dumps(key)}: ')
+            json_backend.write(out, obj, indent=INDENT, default=to_dict, depth=depth, level=REPORT_LEVEL)
+            return
+        json_backend.write(out, obj, indent=INDENT, default=to_dict, depth=depth)
+        out.write("\n")
+
     def format(self, report, settings={}):
-        return json.dumps(report['files'], indent=4)
+        return json_backend.dumps(report['files'], indent=INDENT, default=to_dict)
+
+    def write(self, out, report, settings={}):
+        self._write_json(out, 'files', report['files'], 1, settings)
+
+    def format_fixes(self, fixes, settings={}):
+        return json_backend.dumps(fixes, indent=INDENT, default=to_dict)
+
+    def write_fixes(self, out, fixes, settings={}):
+        self._write_json(out, 'fixes', fixes, 2, settings)
+
+    def format_delta(self, delta, settings={}):
+        return json_backend.dumps(delta, indent=INDENT, default=to_dict)
+
+    def write_delta(self, out, delta, settings={}):
+        self._write_json(out, 'delta', delta, 2, settings)
+
+    def format_groups(self, groups, settings={}):
+        return json_backend.dumps(groups, indent=INDENT, default=to_dict)
+
+    def write_groups(self, out, groups, settings={}):
+        self._write_json(out, 'groups', groups, 1, settings)
+
+    def write_normalized(self, out, report, settings={}):
+        if not settings.get('batch'):
+            super().write_normalized(out, report, settings)
+            return
+        self._write_json(out, 'normalized', report, 2, settings)
 
     def format_cumulative(self, report, settings={}):
         ret = []
-        cumulative = report['cumulative']
+        cumulative = report_cumulative(report)
         ret.append(" * license: {_license}".format(_license=cumulative['license']))
         return "\n".join(ret)
 
+    def write_cumulative(self, out, report, settings={}):
+        if not settings.get('batch'):
+            super().write_cumulative(out, report, settings)
+            return
+        license = report_cumulative(report)['license']
+        self._write_json(out, 'cumulative', {'license': None if license is None else str(license)}, 0, settings)
+
+    def _license_summary(self, report):
+        return " AND ".join(report_cumulative(report).licenses())
+
     def format_license_summary(self, report, settings={}):
-        license_summary = set()
-        for fi in report['files']:
-            for le in fi['license']['expressions']:
-                license_summary.add(le)
-        return json.dumps({"license": f'{" AND ".join(license_summary)}'})
+        return json.dumps({"license": self._license_summary(report)})
+
+    def write_license_summary(self, out, report, settings={}):
+        if not settings.get('batch'):
+            super().write_license_summary(out, report, settings)
+            return
+        self._write_json(out, 'license', self._license_summary(report), 0, settings)
 
     def format_copyright_summary(self, report, settings={}):
-        copyright_summary = set()
-        for fi in report['files']:
-            for cop in fi['copyrights']:
-                copyright_summary.add(cop)
-        c_list = list(copyright_summary)
-        c_list.sort()
-        c_string = "\n".join(c_list)
+        c_string = "\n".join(report_cumulative(report).copyrights())
         return json.dumps({"copyrights": f'\n{c_string}'})
+
+    def write_copyright_summary(self, out, report, settings={}):
+        if not settings.get('batch'):
+            super().write_copyright_summary(out, report, settings)
+            return
+        self._write_json(out, 'copyrights', report_cumulative(report).copyrights(), 0, settings)
+
+    def write_reports_header(self, out):
+        out.write('{' + _indentation(1) + '"reports": [')
+
+    def write_report_header(self, out, file_name, index):
+        separator = ',' if index > 0 else ''
+        out.write(f'{separator}{_indentation(2)}{{{_indentation(REPORT_LEVEL)}"file": {json_backend.dumps(file_name)}')
+
+    def write_report_footer(self, out, file_name):
+        out.write(_indentation(2) + '}')
+
+    def write_reports_footer(self, out, nr_reports, summary_report=None, settings={}):
+        out.write(_indentation(1) + ']')
+        if summary_report is not None:
+            summary = {
+                'reports': nr_reports,
+                'license': self._license_summary(summary_report),
+                'copyrights': report_cumulative(summary_report).copyrights()
+            }
+            out.write(',' + _indentation(1) + '"summary": ')
+            json_backend.write(out, summary, indent=INDENT, level=1)
+        out.write('\n}\n')
@@ -0,0 +1,114 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import io
+
+from scarfer.cumulative import report_cumulative
+from scarfer.format.interface import FormatInterface
+from scarfer import json_backend
+from scarfer.records import to_dict
+
+# JSON Lines (https://jsonlines.org/), one compact JSON record per line,
+# written as soon as it is formatted. Files are written as normalized
+# files, other records have one key telling what they are, e.g.
+#
+#    {"path": "src/apa.c", "sha1": ..., "license": {...}}
+#    {"summary": {"license": ..., "licenses": {...}, "copyrights": {...}}}
+
+def _license(cumulative):
+    license = cumulative['license']
+    return None if license is None else str(license)
+
+def _licenses(cumulative):
+    # the number of files per license expression
+    licenses = cumulative.files_per_license()
+    return {le: licenses[le] for le in cumulative.licenses()}
+
+def _copyrights(cumulative):
+    # the number of files per copyright
+    copyrights = cumulative.files_per_copyright()
+    return {cop: copyrights[cop] for cop in cumulative.copyrights()}
+
+class JsonLinesFormatter(FormatInterface):
+
+    def _write_record(self, out, record):
+        out.write(json_backend.dumps(record, default=to_dict))
+        out.write("\n")
+
+    def _format(self, write, *args):
+        out = io.StringIO()
+        write(out, *args)
+        return out.getvalue()[:-1]
+
+    def _summary(self, report):
+        cumulative = report_cumulative(report)
+        return {
+            'license': _license(cumulative),
+            'licenses': _licenses(cumulative),
+            'copyrights': _copyrights(cumulative)
+        }
+
+    def write_report_header(self, out, file_name, index):
+        self._write_record(out, {'report': file_name})
+
+    def write_reports_footer(self, out, nr_reports, summary_report=None, settings={}):
+        if summary_report is None:
+            return
+        self._write_record(out, {'reports': nr_reports})
+        self.write_copyright_summary(out, summary_report, settings)
+        self.write_license_summary(out, summary_report, settings)
+
+    def format(self, report, settings={}):
+        return self._format(self.write, report, settings)
+
+    def write(self, out, report, settings={}):
+        for f in report['files']:
+            self._write_record(out, f)
+        # optional trailing records
+        if settings.get('append_summary'):
+            self._write_record(out, {'summary': self._summary(report)})
+        if settings.get('append_fixes') and 'fixes' in report:
+            self._write_record(out, {'fixes': report['fixes']})
+
+    def format_fixes(self, fixes, settings={}):
+        return self._format(self.write_fixes, fixes, settings)
+
+    def write_fixes(self, out, fixes, settings={}):
+        self._write_record(out, {'fixes': fixes})
+
+    def format_cumulative(self, report, settings={}):
+        return self._format(self.write_cumulative, report, settings)
+
+    def write_cumulative(self, out, report, settings={}):
+        self._write_record(out, {'cumulative': {'license': _license(report_cumulative(report))}})
+
+    def format_license_summary(self, report, settings={}):
+        return self._format(self.write_license_summary, report, settings)
+
+    def write_license_summary(self, out, report, settings={}):
+        self._write_record(out, {'licenses': _licenses(report_cumulative(report))})
+
+    def format_copyright_summary(self, report, settings={}):
+        return self._format(self.write_copyright_summary, report, settings)
+
+    def write_copyright_summary(self, out, report, settings={}):
+        self._write_record(out, {'copyrights': _copyrights(report_cumulative(report))})
+
+    def format_delta(self, delta, settings={}):
+        return self._format(self.write_delta, delta, settings)
+
+    def write_delta(self, out, delta, settings={}):
+        for f in delta['added']:
+            self._write_record(out, {'added': f})
+        for f in delta['removed']:
+            self._write_record(out, {'removed': f})
+        for changed in delta['changed']:
+            self._write_record(out, {'changed': changed})
+
+    def format_groups(self, groups, settings={}):
+        return self._format(self.write_groups, groups, settings)
+
+    def write_groups(self, out, groups, settings={}):
+        for group in groups:
+            self._write_record(out, group)
@@ -2,6 +2,7 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from scarfer.cumulative import report_cumulative
 from scarfer.format.format_text import TextFormatter
 import os
 
@@ -17,11 +18,6 @@ class MarkdownFormatter(TextFormatter):
         return f'{os.linesep.join(excluded)}{os.linesep}{os.linesep.join(missing)}'
 
     def format_copyright_summary(self, report, settings={}):
-        copyright_summary = set()
-        for f in report['files']:
-            for cop in f['copyrights']:
-                copyright_summary.add(f'{cop}{os.linesep}')
-        c_list = list(copyright_summary)
-        c_list.sort()
+        c_list = sorted([f'{cop}{os.linesep}' for cop in report_cumulative(report).copyrights()])
         c_string = "\n".join(c_list)
         return f'{c_string}\n'
@@ -2,14 +2,24 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from scarfer.cumulative import report_cumulative
 from scarfer.format.interface import FormatInterface
+from scarfer.format.format_utils import settings_fields
 from scarfer.format.format_utils import summarize_license
+from scarfer.simplifier import simplify_license
 import os
-from flict.flictlib.arbiter import Arbiter
+
+FILES_HEADER = "Files:\n----------------------------"
+ADDED_HEADER = "Added files:\n----------------------------"
+REMOVED_HEADER = "Removed files:\n----------------------------"
+CHANGED_HEADER = "Changed files:\n----------------------------"
 
 class TextFormatter(FormatInterface):
 
-    def _format_file(self, f, settings):
+    def fields(self, settings={}):
+        return settings_fields(settings)
+
+    def _format_file(self, f, settings, same_paths=[]):
         ret = []
 
         copyrights = settings.get('copyrights')
@@ -20,6 +30,8 @@ class TextFormatter(FormatInterface):
             ret.append("{path}: {license}".format(path=f['path'], license=str(f['license']['expressions'])))
         else:
             ret.append("{path}".format(path=f['path']))
+        for path in same_paths:
+            ret.append(" = {path}".format(path=path))
 
         if copyrights:
             for cr in f['copyrights']:
@@ -37,13 +49,43 @@ class TextFormatter(FormatInterface):
             ret.append(self._format_file(f, settings))
         return "\n".join(ret)
 
+    def _format_group(self, group, settings):
+        # files with identical content as the first file, followed by
+        # the paths of the others
+        paths = group['paths']
+        return self._format_file(dict(group, path=paths[0]), settings, paths[1:])
+
+    def _write_lines(self, out, lines):
+        # as writing "\n".join(lines) followed by a newline
+        empty = True
+        for line in lines:
+            out.write(line)
+            out.write("\n")
+            empty = False
+        if empty:
+            out.write("\n")
+
     def format(self, report, settings):
         results = [
-            "Files:\n----------------------------",
+            FILES_HEADER,
             self._format_files(report, settings),
         ]
         return "\n".join(results)
 
+    def write(self, out, report, settings={}):
+        self._write_lines(out, [FILES_HEADER])
+        self._write_lines(out, (self._format_file(f, settings) for f in report['files']))
+
+    def format_groups(self, groups, settings={}):
+        ret = [FILES_HEADER]
+        for group in groups:
+            ret.append(self._format_group(group, settings))
+        return "\n".join(ret)
+
+    def write_groups(self, out, groups, settings={}):
+        self._write_lines(out, [FILES_HEADER])
+        self._write_lines(out, (self._format_group(group, settings) for group in groups))
+
     def format_fixes(self, fixes, settings={}):
         excluded = ['Filtered out:']
         for f in fixes['excluded_files']:
@@ -53,29 +95,54 @@ class TextFormatter(FormatInterface):
             missing.append(f' * {curation["file"]} -> {curation["curation"]}')
         return f'{os.linesep.join(excluded)}{os.linesep}{os.linesep.join(missing)}'
 
+    def _format_changed(self, changed):
+        ret = []
+        if changed['baseline_path'] != changed['path']:
+            ret.append(f'{changed["path"]} (moved from {changed["baseline_path"]})')
+        else:
+            ret.append(changed['path'])
+        if changed['content_changed']:
+            ret.append(' * content changed')
+        licenses = changed['licenses']
+        if licenses['baseline'] != licenses['report']:
+            ret.append(f' * license: {licenses["baseline"]} -> {licenses["report"]}')
+        for cop in changed['copyrights']['added']:
+            ret.append(f' * copyright added: {cop}')
+        for cop in changed['copyrights']['removed']:
+            ret.append(f' * copyright removed: {cop}')
+        return "\n".join(ret)
+
+    def format_delta(self, delta, settings={}):
+        results = [
+            ADDED_HEADER,
+            self._format_files({'files': delta['added']}, settings),
+            REMOVED_HEADER,
+            self._format_files({'files': delta['removed']}, settings),
+            CHANGED_HEADER,
+            "\n".join([self._format_changed(changed) for changed in delta['changed']])
+        ]
+        return "\n".join(results)
+
+    def write_delta(self, out, delta, settings={}):
+        self._write_lines(out, [ADDED_HEADER])
+        self._write_lines(out, (self._format_file(f, settings) for f in delta['added']))
+        self._write_lines(out, [REMOVED_HEADER])
+        self._write_lines(out, (self._format_file(f, settings) for f in delta['removed']))
+        self._write_lines(out, [CHANGED_HEADER])
+        self._write_lines(out, (self._format_changed(changed) for changed in delta['changed']))
+
     def format_cumulative(self, report, settings={}):
         ret = []
-        cumulative = report['cumulative']
+        cumulative = report_cumulative(report)
         ret.append(f"Cumulative license: {cumulative['license']}")
         return "\n".join(ret)
 
     def format_license_summary(self, report, settings={}):
-        license_summary = set()
-        for fi in report['files']:
-            for le in fi['license']['expressions']:
-                license_summary.add(le)
-        license_summary = summarize_license(list(license_summary))
+        license_summary = summarize_license(report_cumulative(report).licenses())
         if settings.get('simplify'):
-            arbiter = Arbiter()
-            license_summary = arbiter.simplify_license(license_summary)['simplified']
+            license_summary = simplify_license(license_summary)
         return f'License:\n {license_summary}\n' # noqa: E231
 
     def format_copyright_summary(self, report, settings={}):
-        copyright_summary = set()
-        for fi in report['files']:
-            for cop in fi['copyrights']:
-                copyright_summary.add(cop)
-        c_list = list(copyright_summary)
-        c_list.sort()
-        c_string = "\n".join(c_list)
+        c_string = "\n".join(report_cumulative(report).copyrights())
         return f'Copyrights:\n{c_string}\n' # noqa: E231
@@ -2,6 +2,18 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from scarfer.scan_interface import FIELD_COPYRIGHTS
+from scarfer.scan_interface import FIELD_MATCHES
+
+def settings_fields(settings):
+    # the optional fields of normalized files output with settings
+    fields = set()
+    if settings.get('copyrights') or settings.get('copyright_summary'):
+        fields.add(FIELD_COPYRIGHTS)
+    if settings.get('matches'):
+        fields.add(FIELD_MATCHES)
+    return fields
+
 def summarize_license(license_list):
     l_list = []
     for le in license_list:
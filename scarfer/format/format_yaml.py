@@ -2,11 +2,192 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import io
 import yaml
 
+from scarfer.cumulative import Cumulative
+from scarfer.cumulative import report_cumulative
+from scarfer.format.format_utils import settings_fields
+from scarfer.format.format_utils import summarize_license
 from scarfer.format.interface import FormatInterface
+from scarfer.records import FileRecord
+from scarfer.records import LicenseView
+
+# libyaml's emitter, when PyYAML is built with it, is many times faster
+# than the pure Python one
+BaseDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+class Dumper(BaseDumper):
+    pass
+
+def _represent_record(dumper, record):
+    return dumper.represent_dict(record.to_dict())
+
+def _represent_cumulative(dumper, cumulative):
+    return dumper.represent_dict({'license': str(cumulative['license'])})
+
+
+Dumper.add_representer(FileRecord, _represent_record)
+Dumper.add_representer(Cumulative, _represent_cumulative)
+Dumper.add_representer(LicenseView, _represent_record)
+
+def _dump(data, out=None):
+    return yaml.dump(data, out, Dumper=Dumper)
+
+# Many reports are written as one YAML document, with the output of
+# each report in a mapping in "reports":
+#
+#    reports:
+#    - file: scan.json
+#      files:
+#      - path: src/apa.c
+#    summary:
+#      reports: 1
+#      ...
+
+class _Indented:
+    # a text file indenting the lines written to out
+
+    def __init__(self, out, indent):
+        self.out = out
+        self.indent = ' ' * indent
+        self.line_start = True
+
+    def write(self, text):
+        for line in text.splitlines(True):
+            if self.line_start and line != "\n":
+                self.out.write(self.indent)
+            self.out.write(line)
+            self.line_start = line.endswith("\n")
 
 class YamlFormatter(FormatInterface):
 
+    def fields(self, settings={}):
+        return settings_fields(settings)
+
+    def _selected(self, f, settings):
+        # the license and copyrights of f selected by settings, as in
+        # the text format
+        selected = {}
+        if settings.get('licenses') or settings.get('matches'):
+            license = {}
+            if settings.get('licenses'):
+                license['expressions'] = f['license']['expressions']
+            if settings.get('matches'):
+                license['matches'] = f['license']['matches']
+            selected['license'] = license
+        if settings.get('copyrights'):
+            selected['copyrights'] = f['copyrights']
+        return selected
+
+    def _file(self, f, settings):
+        return dict(self._selected(f, settings), path=f['path'])
+
+    def _group(self, group, settings):
+        return dict(self._selected(group, settings), paths=group['paths'],
+                    sha1=group['sha1'], md5=group['md5'], sha256=group['sha256'])
+
+    def _report_out(self, out, key, settings):
+        # where the output of a report is written: out, or with the
+        # batch setting the value of key in the mapping of the report
+        # (or, without key, the mapping itself)
+        if not settings.get('batch'):
+            return out
+        if key is None:
+            return _Indented(out, 2)
+        out.write(f'  {key}:\n')
+        return _Indented(out, 4)
+
+    def _write_list(self, out, items):
+        # a block sequence is the same as its items dumped one by one,
+        # so only one item at a time is in memory
+        empty = True
+        for item in items:
+            _dump([item], out)
+            empty = False
+        if empty:
+            _dump([], out)
+
+    def _format(self, write, *args):
+        out = io.StringIO()
+        write(out, *args)
+        return out.getvalue()[:-1]
+
     def format(self, report, settings={}):
-        return yaml.dump(report)
+        return self._format(self.write, report, settings)
+
+    def write(self, out, report, settings={}):
+        out = self._report_out(out, 'files', settings)
+        self._write_list(out, (self._file(f, settings) for f in report['files']))
+        out.write("\n")
+
+    def format_fixes(self, fixes, settings={}):
+        # excluded files as the files, only the fields read for the
+        # settings are output
+        excluded_files = [self._file(f, settings) for f in fixes['excluded_files']]
+        return _dump(dict(fixes, excluded_files=excluded_files))
+
+    def write_fixes(self, out, fixes, settings={}):
+        self._write(self._report_out(out, 'fixes', settings), self.format_fixes(fixes, settings))
+
+    def format_cumulative(self, report, settings={}):
+        return _dump({'cumulative': report_cumulative(report)})
+
+    def write_cumulative(self, out, report, settings={}):
+        self._write(self._report_out(out, None, settings), self.format_cumulative(report, settings))
+
+    def format_license_summary(self, report, settings={}):
+        return _dump({'license': summarize_license(report_cumulative(report).licenses())})
+
+    def write_license_summary(self, out, report, settings={}):
+        self._write(self._report_out(out, None, settings), self.format_license_summary(report, settings))
+
+    def format_copyright_summary(self, report, settings={}):
+        return _dump({'copyrights': report_cumulative(report).copyrights()})
+
+    def write_copyright_summary(self, out, report, settings={}):
+        self._write(self._report_out(out, None, settings), self.format_copyright_summary(report, settings))
+
+    def write_normalized(self, out, report, settings={}):
+        # JSON, which is YAML too
+        super().write_normalized(self._report_out(out, 'normalized', settings), report, settings)
+
+    def format_delta(self, delta, settings={}):
+        return self._format(self.write_delta, delta, settings)
+
+    def write_delta(self, out, delta, settings={}):
+        out = self._report_out(out, 'delta', settings)
+        for key in ['added', 'removed', 'changed']:
+            if not delta[key]:
+                out.write(f'{key}: []\n')
+                continue
+            out.write(f'{key}:\n')
+            if key == 'changed':
+                self._write_list(out, delta[key])
+            else:
+                self._write_list(out, (self._file(f, settings) for f in delta[key]))
+        out.write("\n")
+
+    def format_groups(self, groups, settings={}):
+        return self._format(self.write_groups, groups, settings)
+
+    def write_groups(self, out, groups, settings={}):
+        out = self._report_out(out, 'groups', settings)
+        self._write_list(out, (self._group(group, settings) for group in groups))
+        out.write("\n")
+
+    def write_reports_header(self, out):
+        out.write('reports:\n')
+
+    def write_report_header(self, out, file_name, index):
+        _dump([{'file': file_name}], out)
+
+    def write_reports_footer(self, out, nr_reports, summary_report=None, settings={}):
+        if summary_report is None:
+            return
+        cumulative = report_cumulative(summary_report)
+        _dump({'summary': {
+            'reports': nr_reports,
+            'license': summarize_license(cumulative.licenses()),
+            'copyrights': cumulative.copyrights()
+        }}, out)
@@ -2,8 +2,11 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from scarfer.scan_interface import ALL_FIELDS
+from scarfer import json_backend
+
 class Settings:
-    def __init__(self, copyrights=False, licenses=False, matches=False, cumulative=False, license_summary=False, copyright_summary=False, simplify=False):
+    def __init__(self, copyrights=False, licenses=False, matches=False, cumulative=False, license_summary=False, copyright_summary=False, simplify=False, append_summary=False, append_fixes=False, batch=False):
         self.settings_map = {}
         self.settings_map['copyrights'] = copyrights
         self.settings_map['licenses'] = licenses
@@ -12,6 +15,10 @@ class Settings:
         self.settings_map['license_summary'] = license_summary
         self.settings_map['copyright_summary'] = copyright_summary
         self.settings_map['simplify'] = simplify
+        self.settings_map['append_summary'] = append_summary
+        self.settings_map['append_fixes'] = append_fixes
+        # a report written as one of many reports, see write_reports_header
+        self.settings_map['batch'] = batch
 
     def get(self, key):
         # print(" get " + key + " from " + str(self.settings_map) + " =====> " + str(self.settings_map.get(key, False)))
@@ -22,6 +29,11 @@ class FormatInterface:
     def __init__(self):
         return
 
+    def fields(self, settings={}):
+        # the optional fields of normalized files, see scan_interface.py,
+        # needed to format with settings
+        return ALL_FIELDS
+
     def format(self, report, settings={}):
         return
 
@@ -36,3 +48,68 @@ class FormatInterface:
 
     def format_cumulative(self, report, settings={}):
         return
+
+    def format_delta(self, delta, settings={}):
+        # delta as returned by ReportDelta.report(), see delta.py
+        return
+
+    def format_groups(self, groups, settings={}):
+        # groups as returned by ContentGroups.report(), see dedup.py
+        return
+
+    # Streaming output, writing to out (a buffered text file) what the
+    # format methods return followed by a newline, as if printed.
+    # Formatters override these to write the output incrementally, e.g.
+    # one file at a time.
+
+    # Many reports are written as: write_reports_header, for each report
+    # write_report_header, the report (with the batch setting) and
+    # write_report_footer, and last write_reports_footer with a summary
+    # of the reports (None with --normalize).
+
+    def write_reports_header(self, out):
+        return
+
+    def write_report_header(self, out, file_name, index):
+        out.write(f'Report: {file_name}\n')
+
+    def write_report_footer(self, out, file_name):
+        return
+
+    def write_reports_footer(self, out, nr_reports, summary_report=None, settings={}):
+        if summary_report is None:
+            return
+        out.write(f'Summary of {nr_reports} reports\n')
+        self.write_copyright_summary(out, summary_report, settings)
+        self.write_license_summary(out, summary_report, settings)
+
+    def write_normalized(self, out, report, settings={}):
+        # the normalized report (--normalize), JSON in all formats
+        json_backend.write(out, report, indent=4, depth=2)
+        out.write("\n")
+
+    def _write(self, out, formatted):
+        if formatted is not None:
+            out.write(formatted)
+            out.write("\n")
+
+    def write(self, out, report, settings={}):
+        self._write(out, self.format(report, settings))
+
+    def write_fixes(self, out, fixes, settings={}):
+        self._write(out, self.format_fixes(fixes, settings))
+
+    def write_license_summary(self, out, report, settings={}):
+        self._write(out, self.format_license_summary(report, settings))
+
+    def write_copyright_summary(self, out, report, settings={}):
+        self._write(out, self.format_copyright_summary(report, settings))
+
+    def write_cumulative(self, out, report, settings={}):
+        self._write(out, self.format_cumulative(report, settings))
+
+    def write_delta(self, out, delta, settings={}):
+        self._write(out, self.format_delta(delta, settings))
+
+    def write_groups(self, out, groups, settings={}):
+        self._write(out, self.format_groups(groups, settings))
@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Reading and writing of JSON, using orjson when installed and Python's
+# json module otherwise.
+#
+# orjson can only indent with two spaces, other indentations are
+# written with the json module so that output does not depend on the
+# backend.
+
+import gc
+import json
+import mmap
+import types
+from contextlib import contextmanager
+
+from scarfer.compression import compression
+from scarfer.compression import open_binary
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "json" if orjson is None else "orjson"
+
+@contextmanager
+def paused_gc():
+    # Parsed JSON has no reference cycles, but creating millions of
+    # objects triggers the cyclic garbage collector over and over
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def load_file(file_name):
+    if compression(file_name) is not None:
+        # decompressed in memory, compressed files can not be mapped
+        with open_binary(file_name) as fp:
+            return loads(fp.read())
+
+    if orjson is None:
+        with open(file_name) as fp:
+            return json.load(fp)
+
+    with open(file_name, 'rb') as fp:
+        try:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            return orjson.loads(fp.read())
+    with mapped, memoryview(mapped) as view:
+        return orjson.loads(view)
+
+def dumps(obj, indent=None, default=None):
+    if orjson is not None and indent in [None, 2]:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+        except TypeError:
+            # e.g. integers orjson does not support, let json try
+            pass
+    if indent is None:
+        return json.dumps(obj, default=default, separators=(',', ':'), ensure_ascii=False)
+    if indent == 2:
+        # as orjson, which does not escape non-ASCII characters
+        return json.dumps(obj, indent=indent, default=default, ensure_ascii=False)
+    return json.dumps(obj, indent=indent, default=default)
+
+
+def _write(fp, obj, indent, default, depth, level):
+    if depth == 0 or not isinstance(obj, (dict, list, types.GeneratorType)):
+        value = dumps(obj, indent=indent, default=default)
+        if indent is not None and level > 0:
+            value = value.replace('\n', '\n' + ' ' * indent * level)
+        fp.write(value)
+        return
+
+    if isinstance(obj, dict):
+        start, end = '{', '}'
+        items = obj.items()
+    else:
+        start, end = '[', ']'
+        items = obj
+    if indent is None:
+        separator, newline, key_separator = ',', '', ':'
+    else:
+        separator, newline, key_separator = ',', '\n' + ' ' * indent * (level + 1), ': '
+
+    fp.write(start)
+    empty = True
+    for item in items:
+        fp.write(newline if empty else separator + newline)
+        empty = False
+        if end == '}':
+            key, item = item
+            fp.write(dumps(str(key), indent=indent) + key_separator)
+        _write(fp, item, indent, default, depth - 1, level + 1)
+    if not empty and indent is not None:
+        fp.write('\n' + ' ' * indent * level)
+    fp.write(end)
+
+def write(fp, obj, indent=None, default=None, depth=1, level=0):
+    # Write obj to fp, a text file, as dumps() would. Dicts and lists
+    # (or generators), nested depth levels, are written one item at a
+    # time, so that the entire JSON is never in memory. With level, obj
+    # is indented as a value nested level levels in other JSON.
+    _write(fp, obj, indent, default, depth, level)
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+NUMBER_CHARS = '0123456789.eE+-'
+
+
+class JsonStreamException(Exception):
+
+    def __init__(self, message=""):
+        self.message = message
+        super().__init__(self.message)
+
+
+# Incremental reader of a JSON document with an object at the top
+# level. Only one value (or, for arrays listed in lazy_keys, one array
+# element) at a time is kept in memory.
+#
+# items() yields (key, value) pairs. For keys in lazy_keys, value is a
+# generator over the array elements. Elements not consumed when the
+# next pair is requested are skipped.
+class JsonObjectStream:
+
+    def __init__(self, fp, lazy_keys=(), chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.lazy_keys = lazy_keys
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        # characters dropped from the start of buf, to tell offsets in
+        # the file
+        self.dropped = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        if self.eof:
+            return False
+        chunk = self.fp.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.dropped += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars):
+        c = self._peek()
+        if c == '' or c not in chars:
+            raise JsonStreamException(f'Expected one of "{chars}" at offset {self.dropped + self.pos}, found "{c}"')
+        self.pos += 1
+        return c
+
+    def _decode(self):
+        self._peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # a number at the end of the buffer may continue in the next chunk
+                if (end < len(self.buf) and self.buf[end] not in NUMBER_CHARS) or not self._fill(size):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if not self._fill(size):
+                    raise JsonStreamException(f'Could not decode JSON at offset {self.dropped + e.pos}: {e.msg}')
+            # grow the read size to keep re-decoding of huge values linear
+            size = size * 2
+
+    def _array(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self._decode()
+            if self._expect(',]') == ']':
+                return
+
+    def _drain(self, values):
+        for value in values:
+            pass
+
+    def items(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self._decode()
+            self._expect(':')
+            if key in self.lazy_keys and self._peek() == '[':
+                values = self._array()
+                yield key, values
+                self._drain(values)
+            else:
+                yield key, self._decode()
+            if self._expect(',}') == '}':
+                return
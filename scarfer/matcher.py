@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import fnmatch
+import re
+
+# backreferences, and conditionals, can not be combined with other
+# patterns since the groups are renumbered
+BACKREFERENCE_RE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+def compile_pattern(expr, use_fnmatch=False):
+    if use_fnmatch:
+        return re.compile(fnmatch.translate(expr))
+    return re.compile(expr)
+
+
+# A set of patterns matched with one regex scan. The patterns are
+# combined into one alternation, which only has to be searched once for
+# a string not matching any pattern. Capturing groups, one per pattern,
+# would make the alternation slower than searching the patterns one by
+# one, so the matching pattern is instead found by matching the patterns
+# where the alternation matched.
+#
+# Regular expressions are searched for (like re.search), fnmatch
+# patterns must match the entire string (like fnmatch.fnmatch). If the
+# patterns can not be combined, they are matched one by one.
+class RegexSet:
+
+    def __init__(self, patterns, use_fnmatch=False):
+        self.patterns = list(patterns)
+        self.use_fnmatch = use_fnmatch
+        self.regexes = [compile_pattern(pattern, use_fnmatch) for pattern in self.patterns]
+        self.combined = self._combine()
+
+    def _combine(self):
+        if len(self.regexes) < 2:
+            return None
+        if any([BACKREFERENCE_RE.search(regex.pattern) for regex in self.regexes]):
+            return None
+        try:
+            return re.compile("|".join([f'(?:{regex.pattern})' for regex in self.regexes]))
+        except re.error:
+            # e.g. inline flags, which must start the pattern
+            return None
+
+    def _match(self, regex, item):
+        if self.use_fnmatch:
+            return regex.match(item)
+        return regex.search(item)
+
+    def match(self, item):
+        # the index of a pattern matching item, or None
+        if self.combined is None:
+            for index, regex in enumerate(self.regexes):
+                if self._match(regex, item) is not None:
+                    return index
+            return None
+
+        found = self._match(self.combined, item)
+        if found is None:
+            return None
+        # the first pattern matching where the alternation matched,
+        # which is the alternative the alternation matched with
+        start = found.start()
+        for index, regex in enumerate(self.regexes):
+            if regex.match(item, start) is not None:
+                return index
+        return None
+
+    def match_all(self, item):
+        # the indexes of all patterns matching item
+        return [index for index, regex in enumerate(self.regexes) if self._match(regex, item) is not None]
+
+    def __len__(self):
+        return len(self.patterns)
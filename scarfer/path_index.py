@@ -0,0 +1,192 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from scarfer.matcher import RegexSet
+
+# Index of file filters. Most file filters are literal names and
+# directories, e.g. "README$" or "autom4te\.cache/", which are stored in
+# tries so that matching a path depends on the length of the path and
+# not on the number of filters. Only the remaining filters are matched
+# as regular expressions (see matcher.py).
+#
+# Literals are indexed as:
+#
+#    exact      "^lit$"         "lit"     (regular expression, fnmatch)
+#    prefixes   "^lit"          "lit*"
+#    suffixes   "lit$"          "*lit"
+#    substrings "lit"           "*lit*"
+#
+# Prefixes and substrings matching the directory of a path match every
+# path in that directory, so they are matched once per directory.
+
+END = None
+SPECIAL_CHARS = set('.^$*+?{}[]|()')
+FNMATCH_SPECIAL_CHARS = set('*?[')
+
+def _re_literal(pattern):
+    # (literal, anchored at start, anchored at end), or None if the
+    # regular expression is not a literal
+    start = pattern.startswith('^')
+    end = False
+    chars = []
+    index = 1 if start else 0
+    while index < len(pattern):
+        c = pattern[index]
+        if c == '\\':
+            # \d, \A, \1 etc are not literals
+            if index + 1 == len(pattern) or pattern[index + 1].isalnum():
+                return None
+            chars.append(pattern[index + 1])
+            index += 2
+            continue
+        if c == '$' and index == len(pattern) - 1:
+            end = True
+        elif c in SPECIAL_CHARS:
+            return None
+        else:
+            chars.append(c)
+        index += 1
+    return "".join(chars), start, end
+
+def _fnmatch_literal(pattern):
+    literal = pattern.strip('*')
+    if FNMATCH_SPECIAL_CHARS.intersection(literal):
+        return None
+    return literal, not pattern.startswith('*'), not pattern.endswith('*')
+
+def _add(trie, chars, index):
+    node = trie
+    for c in chars:
+        node = node.setdefault(c, {})
+    node.setdefault(END, []).append(index)
+
+def _prefixes(trie, text):
+    # indexes of the literals in trie starting text
+    found = []
+    node = trie
+    for c in text:
+        found.extend(node.get(END, []))
+        node = node.get(c)
+        if node is None:
+            return found
+    found.extend(node.get(END, []))
+    return found
+
+def _suffixes(trie, text, end):
+    # indexes of the (reversed) literals in trie ending text[:end]
+    found = []
+    node = trie
+    for position in range(end - 1, -1, -1):
+        found.extend(node.get(END, []))
+        node = node.get(text[position])
+        if node is None:
+            return found
+    found.extend(node.get(END, []))
+    return found
+
+
+class PathIndex:
+
+    def __init__(self, patterns, use_fnmatch=False):
+        self.patterns = list(patterns)
+        self.use_fnmatch = use_fnmatch
+        self.exact = {}
+        self.prefixes = {}
+        self.suffixes = {}
+        # reversed substrings by their last character
+        self.substrings = {}
+        self.regex_indexes = []
+        for index, pattern in enumerate(self.patterns):
+            self._add(index, pattern)
+        self.regex_set = RegexSet([self.patterns[index] for index in self.regex_indexes], use_fnmatch)
+        self.all_patterns = None
+        self.directories = {}
+
+    def _add(self, index, pattern):
+        if self.use_fnmatch:
+            literal = _fnmatch_literal(pattern)
+        else:
+            literal = _re_literal(pattern)
+        if literal is None or literal[0] == "":
+            self.regex_indexes.append(index)
+            return
+        chars, start, end = literal
+        if start and end:
+            self.exact.setdefault(chars, []).append(index)
+        elif start:
+            _add(self.prefixes, chars, index)
+        elif end:
+            _add(self.suffixes, reversed(chars), index)
+        else:
+            _add(self.substrings.setdefault(chars[-1], {}), reversed(chars), index)
+
+    def _substrings(self, text, begin, end):
+        # indexes of the substrings ending within text[begin:end]
+        found = []
+        for c, trie in self.substrings.items():
+            position = text.find(c, begin, end)
+            while position != -1:
+                found.extend(_suffixes(trie, text, position + 1))
+                position = text.find(c, position + 1, end)
+        return found
+
+    def _directory(self, directory):
+        # indexes of the filters matching all paths in directory
+        found = self.directories.get(directory)
+        if found is None:
+            found = _prefixes(self.prefixes, directory) + self._substrings(directory, 0, len(directory))
+            self.directories[directory] = found
+        return found
+
+    def _fallback(self, path):
+        # "$" also matches before a trailing newline, so paths with
+        # newlines are matched with the regular expressions
+        if '\n' in path and not self.use_fnmatch:
+            if self.all_patterns is None:
+                self.all_patterns = RegexSet(self.patterns)
+            return self.all_patterns
+        return None
+
+    def _literals(self, path, split):
+        # indexes of the literals matching path, but not its directory
+        yield self.exact.get(path, [])
+        yield _suffixes(self.suffixes, path, len(path))
+        yield _prefixes(self.prefixes, path)
+        yield self._substrings(path, split, len(path))
+
+    def match(self, path):
+        # the index of a filter matching path, or None
+        fallback = self._fallback(path)
+        if fallback is not None:
+            return fallback.match(path)
+
+        split = path.rfind('/') + 1
+        found = self._directory(path[:split])
+        if found:
+            # an excluded directory, no need to look at the file name
+            return found[0]
+        for found in self._literals(path, split):
+            if found:
+                return found[0]
+        if self.regex_indexes:
+            index = self.regex_set.match(path)
+            if index is not None:
+                return self.regex_indexes[index]
+        return None
+
+    def match_all(self, path):
+        # the indexes of all filters matching path
+        fallback = self._fallback(path)
+        if fallback is not None:
+            return fallback.match_all(path)
+
+        split = path.rfind('/') + 1
+        found = set(self._directory(path[:split]))
+        for literals in self._literals(path, split):
+            found.update(literals)
+        found.update([self.regex_indexes[index] for index in self.regex_set.match_all(path)])
+        return sorted(found)
+
+    def __len__(self):
+        return len(self.patterns)
@@ -0,0 +1,369 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Queries on normalized files, e.g.
+#
+#    (license:gpl or license:lgpl) and not path^=test/
+#
+# A query is predicates combined with "and", "or", "not" and
+# parentheses. A predicate is a field, an operator and a value:
+#
+#    fields:    path, license, copyright, sha1, md5, sha256
+#    operators: ":"  value is a regular expression found in the field
+#               "="  field is value
+#               "^=" field starts with value
+#               "$=" field ends with value
+#
+# Values with spaces or parentheses are quoted, "like this" or 'this'.
+# A file matches a license, or copyright, predicate if any of its
+# license expressions, or copyrights, matches. Files without license
+# expressions match "license:missing" and "license=missing".
+#
+# Before matching files, a query is planned: the predicates are matched
+# with a sample of the files to estimate how often they match. "and"
+# and "or" then match their cheapest and most decisive operands first.
+# Exact matches in an "or" are combined into one set lookup.
+
+import re
+
+from scarfer.scan_interface import FIELD_COPYRIGHTS
+from scarfer.scan_interface import FIELD_HASHES
+
+FIELDS = ('path', 'license', 'copyright', 'sha1', 'md5', 'sha256')
+HASH_FIELDS = ('sha1', 'md5', 'sha256')
+MULTI_VALUE_FIELDS = ('license', 'copyright')
+
+# relative cost of matching, and default share of values matching
+COSTS = {'=': 1, 'in': 1, '^=': 2, '$=': 2, ':': 10}
+SELECTIVITIES = {'=': 0.05, 'in': 0.1, '^=': 0.2, '$=': 0.2, ':': 0.3}
+MULTI_VALUE_COST = 3
+SAMPLE_SIZE = 200
+
+TOKEN_RE = re.compile(r'''\s*(?:
+    (?P<paren>[()])
+  | (?P<field>[A-Za-z0-9]+)\s*(?P<operator>\^=|\$=|=|:)\s*
+        (?P<value>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^\s()]+)
+  | (?P<word>[^\s()]+)
+)''', re.VERBOSE)
+
+class QueryException(Exception):
+
+    def __init__(self, message=""):
+        self.message = message
+        super().__init__(self.message)
+
+def _values(f, field):
+    # the values of field in f, license None for no license expressions
+    if field == 'path':
+        return [f['path']]
+    if field == 'license':
+        return f['license']['expressions'] or [None]
+    if field == 'copyright':
+        return f['copyrights']
+    return [f[field]]
+
+
+class Predicate:
+
+    def __init__(self, field, operator, value):
+        self.field = field
+        self.operator = operator
+        self.value = value
+        if field in HASH_FIELDS and operator != ':':
+            # hashes are compared in lower case
+            self.value = value.lower()
+        if operator == ':':
+            try:
+                self.regex = re.compile(value)
+            except re.error as e:
+                raise QueryException(f'Invalid regular expression "{value}": {e}')
+        # license expressions and copyrights are few, compared to files
+        self.memo = {} if field in MULTI_VALUE_FIELDS else None
+        self.cost = COSTS[operator] + (MULTI_VALUE_COST if self.memo is not None else 0)
+        self.selectivity = SELECTIVITIES[operator]
+
+    def _match_value(self, value):
+        if value is None:
+            if self.field == 'license':
+                value = 'missing'
+            else:
+                return False
+        elif self.field in HASH_FIELDS:
+            value = value.lower()
+        if self.operator == ':':
+            return self.regex.search(value) is not None
+        if self.operator == '=':
+            return value == self.value
+        if self.operator == '^=':
+            return value.startswith(self.value)
+        return value.endswith(self.value)
+
+    def _match_memo(self, value):
+        matched = self.memo.get(value)
+        if matched is None:
+            matched = self._match_value(value)
+            self.memo[value] = matched
+        return matched
+
+    def matches(self, f):
+        values = _values(f, self.field)
+        if self.memo is None:
+            return self._match_value(values[0])
+        for value in values:
+            if self._match_memo(value):
+                return True
+        return False
+
+    def predicates(self):
+        return [self]
+
+    def __str__(self):
+        return f'{self.field}{self.operator}"{self.value}"'
+
+
+# Exact matches of one field, combined from predicates in an "or"
+class InSet(Predicate):
+
+    def __init__(self, field, values):
+        self.field = field
+        self.operator = 'in'
+        self.values = set(values)
+        self.memo = None
+        self.cost = COSTS['in'] + (MULTI_VALUE_COST if field in MULTI_VALUE_FIELDS else 0)
+        self.selectivity = min(1, SELECTIVITIES['='] * len(self.values))
+
+    def matches(self, f):
+        for value in _values(f, self.field):
+            if value is None and self.field == 'license':
+                value = 'missing'
+            elif value is not None and self.field in HASH_FIELDS:
+                value = value.lower()
+            if value in self.values:
+                return True
+        return False
+
+    def __str__(self):
+        return f'{self.field} in {sorted(self.values)}'
+
+
+class Not:
+
+    def __init__(self, operand):
+        self.operand = operand
+        self.cost = operand.cost
+        self.selectivity = 1 - operand.selectivity
+
+    def matches(self, f):
+        return not self.operand.matches(f)
+
+    def predicates(self):
+        return self.operand.predicates()
+
+    def __str__(self):
+        return f'not {self.operand}'
+
+
+class And:
+
+    def __init__(self, operands):
+        self.operands = operands
+        self._estimate()
+
+    def _estimate(self):
+        # expected cost, when stopping at the first operand not matching
+        self.cost = 0
+        self.selectivity = 1
+        for operand in self.operands:
+            self.cost += self.selectivity * operand.cost
+            self.selectivity *= operand.selectivity
+
+    def order(self):
+        # cheap operands, and operands seldom matching, first
+        self.operands.sort(key=lambda operand: operand.cost / max(1 - operand.selectivity, 1e-6))
+        self._estimate()
+
+    def matches(self, f):
+        for operand in self.operands:
+            if not operand.matches(f):
+                return False
+        return True
+
+    def predicates(self):
+        return [predicate for operand in self.operands for predicate in operand.predicates()]
+
+    def __str__(self):
+        return "(" + " and ".join([str(operand) for operand in self.operands]) + ")"
+
+
+class Or(And):
+
+    def _estimate(self):
+        # expected cost, when stopping at the first operand matching
+        self.cost = 0
+        not_matching = 1
+        for operand in self.operands:
+            self.cost += not_matching * operand.cost
+            not_matching *= 1 - operand.selectivity
+        self.selectivity = 1 - not_matching
+
+    def order(self):
+        # cheap operands, and operands often matching, first
+        self.operands.sort(key=lambda operand: operand.cost / max(operand.selectivity, 1e-6))
+        self._estimate()
+
+    def matches(self, f):
+        for operand in self.operands:
+            if operand.matches(f):
+                return True
+        return False
+
+    def __str__(self):
+        return "(" + " or ".join([str(operand) for operand in self.operands]) + ")"
+
+
+class Parser:
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = self._tokenize(text)
+        self.position = 0
+
+    def _tokenize(self, text):
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            token = TOKEN_RE.match(text, position)
+            if token is None:
+                raise QueryException(f'Invalid query "{text}" at position {position}')
+            position = token.end()
+            if token.group('paren'):
+                tokens.append(token.group('paren'))
+            elif token.group('field'):
+                tokens.append(self._predicate(token.group('field'), token.group('operator'), token.group('value')))
+            else:
+                tokens.append(token.group('word').lower())
+        return tokens
+
+    def _predicate(self, field, operator, value):
+        field = field.lower()
+        if field not in FIELDS:
+            raise QueryException(f'Unknown field "{field}", supported fields: {", ".join(FIELDS)}')
+        if value[0] in '"\'':
+            quote = value[0]
+            value = value[1:-1].replace('\\' + quote, quote)
+        return Predicate(field, operator, value)
+
+    def _peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise QueryException(f'Unexpected end of query "{self.text}"')
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self._or()
+        if self._peek() is not None:
+            raise QueryException(f'Unexpected "{self._peek()}" in query "{self.text}"')
+        return node
+
+    def _or(self):
+        operands = [self._and()]
+        while self._peek() == 'or':
+            self._next()
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else Or(operands)
+
+    def _and(self):
+        operands = [self._not()]
+        while self._peek() == 'and':
+            self._next()
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else And(operands)
+
+    def _not(self):
+        if self._peek() == 'not':
+            self._next()
+            return Not(self._not())
+        return self._primary()
+
+    def _primary(self):
+        token = self._next()
+        if token == '(':
+            node = self._or()
+            if self._next() != ')':
+                raise QueryException(f'Missing ")" in query "{self.text}"')
+            return node
+        if isinstance(token, Predicate):
+            return token
+        raise QueryException(f'Unexpected "{token}" in query "{self.text}"')
+
+
+def _sample(files):
+    step = max(1, len(files) // SAMPLE_SIZE)
+    return files[::step][:SAMPLE_SIZE]
+
+def _combine_exact(operands):
+    # exact matches of the same field in an "or" as one set lookup
+    exact = {}
+    others = []
+    for operand in operands:
+        if isinstance(operand, Predicate) and operand.operator == '=':
+            exact.setdefault(operand.field, []).append(operand.value)
+        else:
+            others.append(operand)
+    for field, values in exact.items():
+        others.append(InSet(field, values))
+    return others
+
+def _plan(node, sample):
+    if isinstance(node, Predicate):
+        if sample:
+            node.selectivity = sum([1 for f in sample if node.matches(f)]) / len(sample)
+        return node
+    if isinstance(node, Not):
+        operand = _plan(node.operand, sample)
+        return Not(operand)
+    operands = [_plan(operand, sample) for operand in node.operands]
+    if isinstance(node, Or):
+        operands = [_plan(operand, sample) if isinstance(operand, InSet) else operand
+                    for operand in _combine_exact(operands)]
+        if len(operands) == 1:
+            return operands[0]
+    node = node.__class__(operands)
+    node.order()
+    return node
+
+
+class Query:
+
+    def __init__(self, text):
+        self.text = text
+        self.tree = Parser(text).parse()
+
+    def plan(self, files):
+        # order the query for files, a list of normalized files
+        self.tree = _plan(self.tree, _sample(files))
+
+    def matches(self, f):
+        return self.tree.matches(f)
+
+    def fields(self):
+        # the optional fields of normalized files, see scan_interface.py,
+        # needed to match the query
+        fields = set()
+        for predicate in self.tree.predicates():
+            if predicate.field == 'copyright':
+                fields.add(FIELD_COPYRIGHTS)
+            elif predicate.field in HASH_FIELDS:
+                fields.add(FIELD_HASHES)
+        return fields
+
+    def __str__(self):
+        return self.text
@@ -0,0 +1,194 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from collections.abc import MutableMapping
+
+FILE_KEYS = ('path', 'sha1', 'md5', 'sha256', 'copyrights', 'license')
+LICENSE_KEYS = ('expressions', 'matches')
+
+
+# Table of unique strings, and tuples of strings, so that equal values
+# read from a scan report are stored once
+class StringTable:
+
+    def __init__(self):
+        self.values = {}
+
+    def intern(self, value):
+        if value is None:
+            return None
+        return self.values.setdefault(value, value)
+
+    def intern_tuple(self, values):
+        return self.intern(tuple([self.intern(value) for value in values]))
+
+    def intern_matches(self, matches):
+        return self.intern(tuple([self.intern_tuple((m['key'], m['text'])) for m in matches]))
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _pack_hash(value):
+    # hashes are mostly unique, not worth interning
+    try:
+        packed = bytes.fromhex(value)
+    except (TypeError, ValueError):
+        return value
+    if packed.hex() != value:
+        return value
+    return packed
+
+def _unpack_hash(value):
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+# Compact version of a normalized file (see scan_interface.py) with
+# all values interned in a StringTable. Paths are stored as interned
+# directory and file name, hashes as bytes. Can be used as the
+# normalized file dict, lists and dicts are created when read.
+class FileRecord(MutableMapping):
+
+    __slots__ = ('table', 'directory', 'name', '_sha1', '_md5', '_sha256', 'copyrights', 'expressions', 'matches')
+
+    def __init__(self, table, path, sha1, md5, sha256, copyrights, expressions, matches):
+        self.table = table
+        self.path = path
+        self.sha1 = sha1
+        self.md5 = md5
+        self.sha256 = sha256
+        self.copyrights = table.intern_tuple(copyrights)
+        self.expressions = table.intern_tuple(expressions)
+        self.matches = table.intern_matches(matches)
+
+    @property
+    def path(self):
+        return self.directory + self.name
+
+    @path.setter
+    def path(self, path):
+        split = path.rfind('/') + 1
+        self.directory = self.table.intern(path[:split])
+        self.name = self.table.intern(path[split:])
+
+    @property
+    def sha1(self):
+        return _unpack_hash(self._sha1)
+
+    @sha1.setter
+    def sha1(self, value):
+        self._sha1 = _pack_hash(value)
+
+    @property
+    def md5(self):
+        return _unpack_hash(self._md5)
+
+    @md5.setter
+    def md5(self, value):
+        self._md5 = _pack_hash(value)
+
+    @property
+    def sha256(self):
+        return _unpack_hash(self._sha256)
+
+    @sha256.setter
+    def sha256(self, value):
+        self._sha256 = _pack_hash(value)
+
+    @staticmethod
+    def from_dict(table, f):
+        return FileRecord(table, f['path'], f['sha1'], f['md5'], f['sha256'], f['copyrights'],
+                          f['license']['expressions'], f['license']['matches'])
+
+    def __getitem__(self, key):
+        if key == 'license':
+            return LicenseView(self)
+        if key == 'copyrights':
+            return list(self.copyrights)
+        if key in FILE_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'license':
+            self.expressions = self.table.intern_tuple(value['expressions'])
+            self.matches = self.table.intern_matches(value['matches'])
+        elif key == 'copyrights':
+            self.copyrights = self.table.intern_tuple(value)
+        elif key in FILE_KEYS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise KeyError(f'Can not remove {key} from a FileRecord')
+
+    def __iter__(self):
+        return iter(FILE_KEYS)
+
+    def __len__(self):
+        return len(FILE_KEYS)
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'sha1': self.sha1,
+            'md5': self.md5,
+            'sha256': self.sha256,
+            'copyrights': list(self.copyrights),
+            'license': LicenseView(self).to_dict()
+        }
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+class LicenseView(MutableMapping):
+
+    __slots__ = ('record',)
+
+    def __init__(self, record):
+        self.record = record
+
+    def __getitem__(self, key):
+        if key == 'expressions':
+            return list(self.record.expressions)
+        if key == 'matches':
+            return [{"key": match_key, "text": text} for match_key, text in self.record.matches]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'expressions':
+            self.record.expressions = self.record.table.intern_tuple(value)
+        elif key == 'matches':
+            self.record.matches = self.record.table.intern_matches(value)
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise KeyError(f'Can not remove {key} from a license')
+
+    def __iter__(self):
+        return iter(LICENSE_KEYS)
+
+    def __len__(self):
+        return len(LICENSE_KEYS)
+
+    def to_dict(self):
+        return {
+            'expressions': self['expressions'],
+            'matches': self['matches']
+        }
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+def to_dict(obj):
+    # for use as "default" when serializing, e.g. json.dumps()
+    if isinstance(obj, (FileRecord, LicenseView)):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {obj.__class__.__name__} is not serializable')
@@ -3,11 +3,71 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import json
-import jsonschema
 import os
+import re
+
+from scarfer.json_stream import JsonObjectStream
+from scarfer.compression import CompressionException
+from scarfer.compression import open_text
+from scarfer import json_backend
+from scarfer.records import FileRecord
+from scarfer.records import StringTable
 
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 
+# Optional fields of normalized files. Readers leave out fields not
+# asked for, as empty values. Paths and license expressions are always
+# read.
+FIELD_HASHES = 'hashes'
+FIELD_COPYRIGHTS = 'copyrights'
+FIELD_MATCHES = 'matches'
+ALL_FIELDS = frozenset([FIELD_HASHES, FIELD_COPYRIGHTS, FIELD_MATCHES])
+
+# number of characters, from the start of a report, readers get to
+# decide if they support a report
+SNIFF_SIZE = 1 << 16
+
+# reader classes, tried in order, see register_reader()
+READERS = []
+
+def register_reader(clazz):
+    READERS.append(clazz)
+    return clazz
+
+def read_prefix(file_name, size=SNIFF_SIZE):
+    with open_text(file_name, errors='replace') as fp:
+        return fp.read(size)
+
+
+# validators of normalized reports and files, created once
+_VALIDATORS = {}
+
+def _validators():
+    if not _VALIDATORS:
+        # jsonschema is slow to import, and only used with --normalize
+        import jsonschema
+        schema_file = os.path.join(os.path.join(SCRIPT_DIR, "var"), "normalized-scan.json")
+        with open(schema_file, 'r') as f:
+            schema = json.load(f)
+        clazz = jsonschema.validators.validator_for(schema)
+        clazz.check_schema(schema)
+        _VALIDATORS['report'] = clazz(schema)
+        _VALIDATORS['file'] = clazz(schema['properties']['files']['items'])
+    return _VALIDATORS
+
+def validate_file(normalized_file):
+    if isinstance(normalized_file, FileRecord):
+        normalized_file = normalized_file.to_dict()
+    _validators()['file'].validate(normalized_file)
+
+def validate_files(files, sample=1):
+    # validate every sample:th of the normalized files, while passing
+    # them on
+    for index, f in enumerate(files):
+        if index % sample == 0:
+            validate_file(f)
+        yield f
+
 
 # expected result from read(), from the implementing classes
 # ----------------------
@@ -40,38 +100,70 @@ SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 
 class ScanReportReader:
 
-    def __init__(self, file_name):
+    def __init__(self, file_name, cache=None, compact=False, fields=ALL_FIELDS):
         self.file_name = file_name
         self.report_data = None
-        self.schema = None
+        self.cache = cache
+        # store normalized files as FileRecord, see records.py
+        self.compact = compact
+        self.table = StringTable()
+        self.fields = frozenset(fields)
 
     def report_file(self):
         return self.file_name
 
-    def validate(self):
-        if not self.schema:
-            schema_file = os.path.join(os.path.join(SCRIPT_DIR, "var"), "normalized-scan.json")
-            with open(schema_file, 'r') as f:
-                self.schema = json.load(f)
-            jsonschema.validate(instance=self.data, schema=self.schema)
+    def validate(self, sample=1):
+        # the report, without files, is validated as a whole and then
+        # every sample:th file
+        files = self.data['files']
+        _validators()['report'].validate(dict(self.data, files=[]))
+        if not isinstance(files, list):
+            self.data['files'] = validate_files(files, sample)
+            return
+        for f in files[::sample]:
+            validate_file(f)
 
-    def read(self):
-        clazzes = [FakeReportReader, ScancodeReportReader]
-        self.data = None
-        for clazz in clazzes:
-            exceptions = []
-            try:
-                self.data = clazz(self.file_name).read()
-                break
-            except FileNotFoundError:
-                raise (ScanReportException(f'File {self.file_name} not found'))
-            except Exception as e:
-                exceptions.append(e)
-        if self.data is None:
-            raise (ScanReportException(f'File {self.file_name} not in a supported format. Exceptions caught: {exceptions}'))
+    @classmethod
+    def sniff(cls, prefix):
+        # True if the report, starting with prefix, is supported
+        return False
+
+    def _reader_class(self):
+        try:
+            prefix = read_prefix(self.file_name)
+        except FileNotFoundError:
+            raise (ScanReportException(f'File {self.file_name} not found'))
+        except (CompressionException, OSError, EOFError) as e:
+            raise (ScanReportException(f'File {self.file_name} could not be read: {e}'))
+        for clazz in READERS:
+            if clazz.sniff(prefix):
+                return clazz
+        raise (ScanReportException(f'File {self.file_name} not in a supported format'))
+
+    def _read(self, method):
+        clazz = self._reader_class()
+        try:
+            self.data = getattr(clazz(self.file_name, compact=self.compact, fields=self.fields), method)()
+        except ScanReportException:
+            raise
+        except Exception as e:
+            raise (ScanReportException(f'File {self.file_name} could not be read by {clazz.__name__}. Exception caught: {e}'))
 
         return self.data
 
+    def read(self):
+        if self.cache is not None:
+            # the normalized report, not the analyzed, is cached
+            variant = f'read-compact={self.compact}-fields={",".join(sorted(self.fields))}'
+            self.data = self.cache.load(self.file_name, variant, lambda: self._read('read'))
+            return self.data
+        return self._read('read')
+
+    def read_stream(self):
+        # as read(), but "files" is a generator of normalized files
+        # read incrementally from the report
+        return self._read('read_stream')
+
     def __str__(self):
         ret = ["path: {name}".format(name=self.file_name)]
         return '\n'.join(ret)
@@ -82,13 +174,76 @@ class ScanReportException(Exception):
         self.message = message
         super().__init__(self.message)
 
+@register_reader
 class FakeReportReader(ScanReportReader):
 
     def read(self):
         raise (ScanReportException("File not in fake format"))
 
+    def read_stream(self):
+        raise (ScanReportException("File not in fake format"))
+
+#
+# Extractors of normalized data from a file in a Scancode report, one
+# set per Scancode output format, see SCANCODE_FORMATS
+#
+def _copyrights_value(f):
+    return [c['value'] for c in f['copyrights']]
+
+def _copyrights_copyright(f):
+    return [c['copyright'] for c in f['copyrights']]
+
+def _expressions_list(f):
+    return f['license_expressions']
+
+def _expressions_detected(f):
+    expression = f['detected_license_expression']
+    if expression:
+        return [expression]
+    return []
+
+def _matches_licenses(f):
+    return [{"key": le['key'], "text": le['matched_text']} for le in f['licenses'] if 'key' in le and 'matched_text' in le]
+
+def _nothing(f):
+    return []
+
+def _matches_detections(f):
+    return [{"key": match['license_expression'], "text": match['matched_text']} for le in f['license_detections'] for match in le['matches']]
+
+class ScancodeFormat:
+
+    def __init__(self, copyrights, expressions, matches):
+        self.copyrights = copyrights
+        self.expressions = expressions
+        self.matches = matches
+
+
+SCANCODE_FORMAT_DEFAULT = ScancodeFormat(_copyrights_value, _expressions_list, _matches_licenses)
+SCANCODE_FORMAT_2 = ScancodeFormat(_copyrights_copyright, _expressions_list, _matches_licenses)
+SCANCODE_FORMAT_3 = ScancodeFormat(_copyrights_copyright, _expressions_detected, _matches_detections)
+
+# output_format_version, or its first three characters, to format
+SCANCODE_FORMATS = {
+    "2.0.0": SCANCODE_FORMAT_2,
+    "3.0": SCANCODE_FORMAT_3,
+    "3.2": SCANCODE_FORMAT_3,
+    "4.0": SCANCODE_FORMAT_3,
+    "4.1": SCANCODE_FORMAT_3,
+}
+
+@register_reader
 class ScancodeReportReader(ScanReportReader):
 
+    TOOL_NAME_RE = re.compile(r'"tool_name"\s*:\s*"([^"]*)"')
+
+    @classmethod
+    def sniff(cls, prefix):
+        if not prefix.lstrip().startswith('{'):
+            return False
+        tool_name = cls.TOOL_NAME_RE.search(prefix)
+        return tool_name is not None and tool_name.group(1).lower() == "scancode-toolkit"
+
     def check_file_format(self):
         headers = self.json_data['headers'][0]
         tool = headers['tool_name']
@@ -96,98 +251,42 @@ class ScancodeReportReader(ScanReportReader):
         if tool.lower() != "scancode-toolkit":
             raise (ScanReportException(f'File not in Scancode format. Tool={tool}'))
 
-        if self.scancode_format == "2.0.0":
-            self.copyright_value = "copyright"
-            self.licenses_value = "licenses"
-        elif self.scancode_format[:3] == "3.0":
-            self.copyright_value = "copyright"
-            self.licenses_value = "license_detections"
-        elif self.scancode_format[:3] == "3.2":
-            self.copyright_value = "copyright"
-            self.licenses_value = "license_detections"
-        elif self.scancode_format[:3] == "4.0":
-            self.copyright_value = "copyright"
-            self.licenses_value = "license_detections"
-        elif self.scancode_format[:3] == "4.1":
-            self.copyright_value = "copyright"
-            self.licenses_value = "license_detections"
-        else:
-            self.licenses_value = "licenses"
-            self.copyright_value = "value"
+        extractors = SCANCODE_FORMATS.get(self.scancode_format,
+                                          SCANCODE_FORMATS.get(self.scancode_format[:3], SCANCODE_FORMAT_DEFAULT))
+        self.extract_expressions = extractors.expressions
+        self.extract_copyrights = extractors.copyrights if FIELD_COPYRIGHTS in self.fields else _nothing
+        self.extract_matches = extractors.matches if FIELD_MATCHES in self.fields else _nothing
+        self.with_hashes = FIELD_HASHES in self.fields
         self.tool = headers['tool_name']
         self.tool_version = headers['tool_version']
 
-    def read(self):
-        with open(self.file_name) as fp:
-            self.json_data = json.load(fp)
-            self.check_file_format()
-            self.files = self.json_data['files']
+    def _normalize_file(self, f):
+        if not f['type'] == "file":
+            return None
 
-        files = []
-
-        for f in self.files:
-            if not f['type'] == "file":
-                continue
-
-            _file = {}
-
-            # path
-            _file['path'] = f.get('path', '')
-            _file['sha1'] = f.get('sha1', '')
-            _file['md5'] = f.get('md5', '')
-            _file['sha256'] = f.get('sha256', '')
-
-            # copyright
-            _file['copyrights'] = []
-            for c in f['copyrights']:
-                # print(" c: " + str(c) + "  reading: " + self.copyright_value)
-                _file['copyrights'].append(c[self.copyright_value])
-
-            # license
-            _file['license'] = {}
-            matches = []
-            for le in f[self.licenses_value]:
-                vers = self.scancode_format[:3] 
-                if vers == "3.0" or vers == "3.2" or vers == "4.0"  or vers == "4.1":
-                    for match in le['matches']:
-                        matches.append({
-                            "key": match['license_expression'],
-                            "text": match['matched_text']
-                        })
-                else:
-                    if 'key' in le and 'matched_text' in le:
-                        matches.append({
-                            "key": le['key'],
-                            "text": le['matched_text']
-                        })
-
-            if self.scancode_format[:3] == "3.0":
-                if f['detected_license_expression']:
-                    _file['license']['expressions'] = [f['detected_license_expression']]
-                else:
-                    _file['license']['expressions'] = []
-            elif self.scancode_format[:3] == "3.2":
-                if f['detected_license_expression']:
-                    _file['license']['expressions'] = [f['detected_license_expression']]
-                else:
-                    _file['license']['expressions'] = []
-            elif self.scancode_format[:3] == "4.0":
-                if f['detected_license_expression']:
-                    _file['license']['expressions'] = [f['detected_license_expression']]
-                else:
-                    _file['license']['expressions'] = []
-            elif self.scancode_format[:3] == "4.1":
-                if f['detected_license_expression']:
-                    _file['license']['expressions'] = [f['detected_license_expression']]
-                else:
-                    _file['license']['expressions'] = []
-            else:
-                _file['license']['expressions'] = f['license_expressions']
-            _file['license']['matches'] = matches
+        if self.with_hashes:
+            sha1, md5, sha256 = f.get('sha1', ''), f.get('md5', ''), f.get('sha256', '')
+        else:
+            sha1, md5, sha256 = '', '', ''
 
-            files.append(_file)
+        if self.compact:
+            return FileRecord(self.table, f.get('path', ''), sha1, md5, sha256,
+                              self.extract_copyrights(f), self.extract_expressions(f), self.extract_matches(f))
+
+        return {
+            "path": f.get('path', ''),
+            "sha1": sha1,
+            "md5": md5,
+            "sha256": sha256,
+            "copyrights": self.extract_copyrights(f),
+            "license": {
+                "expressions": self.extract_expressions(f),
+                "matches": self.extract_matches(f)
+            }
+        }
 
-        meta = {
+    def _meta(self):
+        return {
             "scanner": {
                 "tool_name": self.tool,
                 "tool_version": self.tool_version,
@@ -195,7 +294,59 @@ class ScancodeReportReader(ScanReportReader):
             }
         }
 
+    def read(self):
+        with json_backend.paused_gc():
+            self.json_data = json_backend.load_file(self.file_name)
+            self.check_file_format()
+            self.files = self.json_data['files']
+
+            files = []
+
+            for f in self.files:
+                _file = self._normalize_file(f)
+                if _file is not None:
+                    files.append(_file)
+
         return {
             "files": files,
-            "meta": meta
+            "meta": self._meta()
+        }
+
+    def _stream_files(self, fp, items):
+        # errors found while the files are read, e.g. a truncated report,
+        # are raised as the errors of read()
+        with fp:
+            try:
+                for key, value in items:
+                    if key != 'files':
+                        continue
+                    for f in value:
+                        _file = self._normalize_file(f)
+                        if _file is not None:
+                            yield _file
+            except ScanReportException:
+                raise
+            except Exception as e:
+                raise (ScanReportException(f'File {self.file_name} could not be read by {self.__class__.__name__}. Exception caught: {e}'))
+
+    def read_stream(self):
+        fp = open_text(self.file_name)
+        items = JsonObjectStream(fp, lazy_keys=['files']).items()
+        try:
+            for key, value in items:
+                if key == 'headers':
+                    self.json_data = {'headers': value}
+                    self.check_file_format()
+                    break
+                if key == 'files':
+                    raise (ScanReportException('File has "files" before "headers", not supported when streaming'))
+            else:
+                raise (ScanReportException('File has no "headers"'))
+        except Exception:
+            fp.close()
+            raise
+
+        return {
+            "files": self._stream_files(fp, items),
+            "meta": self._meta()
         }
@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Simplification of license expressions (--simplify) with flict. flict
+# is slow to import, and to set up, so it is only imported when an
+# expression, not simplified before, is simplified and one Arbiter is
+# used for all expressions.
+#
+# Simplified expressions are remembered, and with a memo file (in the
+# cache directory, see cache.py) also between runs of scarfer, since
+# the same license summaries are simplified over and over.
+
+import json
+import logging
+import os
+import tempfile
+
+MEMO_FILE_NAME = "simplified-licenses.json"
+
+def _flict_version():
+    from flict.flictlib.flict_config import flict_version
+    return flict_version
+
+
+class LicenseSimplifier:
+
+    def __init__(self, memo_file=None):
+        self.memo_file = memo_file
+        self.memo = None
+        self.arbiter = None
+
+    def _arbiter(self):
+        if self.arbiter is None:
+            from flict.flictlib.arbiter import Arbiter
+            self.arbiter = Arbiter()
+        return self.arbiter
+
+    def _read_memo(self):
+        # the simplified expressions in the memo file, if simplified
+        # with the flict version used now
+        try:
+            with open(self.memo_file) as fp:
+                memo = json.load(fp)
+            if memo.get('flict_version') == _flict_version():
+                return memo['simplified']
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logging.debug(f'Could not read simplified licenses from {self.memo_file}: {e}')
+        return {}
+
+    def _write_memo(self):
+        # merged with the memo file, which other processes may have
+        # written to
+        memo = dict(self._read_memo(), **self.memo)
+        directory = os.path.dirname(self.memo_file)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as fp:
+                    json.dump({'flict_version': _flict_version(), 'simplified': memo}, fp)
+                os.replace(tmp_file, self.memo_file)
+            except Exception:
+                os.remove(tmp_file)
+                raise
+        except OSError as e:
+            logging.debug(f'Could not store simplified licenses in {self.memo_file}: {e}')
+
+    def simplify(self, expression):
+        if self.memo is None:
+            self.memo = self._read_memo() if self.memo_file else {}
+        simplified = self.memo.get(expression)
+        if simplified is None:
+            simplified = self._arbiter().simplify_license(expression)['simplified']
+            self.memo[expression] = simplified
+            if self.memo_file:
+                self._write_memo()
+        return simplified
+
+
+# the simplifier used by the formatters
+SIMPLIFIER = LicenseSimplifier()
+
+def use_memo_file(memo_file):
+    if SIMPLIFIER.memo_file != memo_file:
+        SIMPLIFIER.memo_file = memo_file
+        SIMPLIFIER.memo = None
+
+def simplify_license(expression):
+    return SIMPLIFIER.simplify(expression)
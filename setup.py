@@ -38,6 +38,8 @@ setuptools.setup(
     install_requires=requirements,
     extras_require={
         'dev': requirements_dev,
+        'fast': ['orjson'],
+        'zstd': ['zstandard'],
     },
     classifiers=[
         "Development Status :: 4 - Beta",
@@ -0,0 +1,19 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Normalized files, as read by ScanReportReader (see scan_interface.py),
+# for the tests
+
+def normalized_file(path, expressions, copyrights=[], sha1=None, md5=None, sha256=None, matches=[]):
+    return {
+        "path": path,
+        "sha1": sha1,
+        "md5": md5,
+        "sha256": sha256,
+        "copyrights": list(copyrights),
+        "license": {
+            "expressions": list(expressions),
+            "matches": list(matches)
+        }
+    }
@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import copy
+import unittest
+
+from scarfer.analyzer import Analyzer
+from scarfer.analyzer import ScanReportFilter
+from scarfer.analyzer import ScanReportFilterType
+from scarfer.cumulative import simplify
+from tests.normalized import normalized_file
+
+
+NORMALIZED_REPORT = {
+    "files": [
+        normalized_file("cairo/src/cairo.c", ["mit"], ["(c) 2009 Some One"]),
+        normalized_file("cairo/src/cairo-xcb.c", ["gpl-2.0-or-later"]),
+        normalized_file("cairo/src/cairo-xcb.h", ["x11"]),
+        normalized_file("cairo/doc/README", []),
+        normalized_file("cairo/test/test.c", ["mit"], ["(c) 2010 Some Other"]),
+    ]
+}
+
+class TestAnalyzer(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestAnalyzer, self).__init__(*args, **kwargs)
+
+    def _analyzer(self):
+        return Analyzer(copy.deepcopy(NORMALIZED_REPORT))
+
+    def _paths(self, files):
+        return [f['path'] for f in files]
+
+    def test_no_filters(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters()
+        self.assertEqual(5, len(analyzer.report()['files']))
+        self.assertEqual(['missing'], analyzer.report()['files'][3]['license']['expressions'])
+        self.assertEqual([], analyzer.fixes()['exclusions'])
+
+    def test_exclusions(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters([ScanReportFilter("src/"), ScanReportFilter("test/"),
+                                ScanReportFilter("mit", ScanReportFilterType.LICENSE),
+                                ScanReportFilter("gpl", ScanReportFilterType.LICENSE)],
+                               [ScanReportFilter("test/"), ScanReportFilter("Other", ScanReportFilterType.COPYRIGHT),
+                                ScanReportFilter("gpl", ScanReportFilterType.LICENSE)])
+        self.assertEqual(["cairo/src/cairo.c"], self._paths(analyzer.report()['files']))
+
+        fixes = analyzer.fixes()
+        # listed in the order of the filter steps
+        self.assertEqual(["cairo/doc/README", "cairo/src/cairo-xcb.h", "cairo/test/test.c", "cairo/src/cairo-xcb.c"],
+                         self._paths(fixes['excluded_files']))
+        self.assertEqual([
+            {'file': "cairo/doc/README", 'reason': 'not included', 'type': 'file', 'filter': None},
+            {'file': "cairo/src/cairo-xcb.h", 'reason': 'not included', 'type': 'license', 'filter': None},
+            {'file': "cairo/test/test.c", 'reason': 'excluded', 'type': 'file', 'filter': "test/"},
+            {'file': "cairo/src/cairo-xcb.c", 'reason': 'excluded', 'type': 'license', 'filter': "gpl"},
+        ], fixes['exclusions'])
+
+    def test_missing(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters([ScanReportFilter("missing", ScanReportFilterType.LICENSE)])
+        self.assertEqual(["cairo/doc/README"], self._paths(analyzer.report()['files']))
+
+    def test_curate_file_licenses(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters([], [ScanReportFilter("test/")])
+        analyzer.curate_file_licenses([(["xcb", "README"], "bsd-new"), (["xcb.h"], "mit")])
+        expressions = {f['path']: f['license']['expressions'] for f in analyzer.data}
+        self.assertEqual(["bsd-new"], expressions["cairo/src/cairo-xcb.c"])
+        self.assertEqual(["mit"], expressions["cairo/src/cairo-xcb.h"])
+        self.assertEqual(["bsd-new"], expressions["cairo/doc/README"])
+        self.assertEqual(["mit"], expressions["cairo/test/test.c"])
+        # in the order of the curations, as if curated one by one
+        self.assertEqual([
+            ("cairo/src/cairo-xcb.c", "bsd-new", ["gpl-2.0-or-later"]),
+            ("cairo/src/cairo-xcb.h", "bsd-new", ["x11"]),
+            ("cairo/doc/README", "bsd-new", ["missing"]),
+            ("cairo/src/cairo-xcb.h", "mit", ["bsd-new"]),
+        ], [(c['file'], c['curation'], c['original']) for c in analyzer.fixes()['curated_licenses']])
+
+    def test_curate_file_licenses_fnmatch(self):
+        analyzer = Analyzer(copy.deepcopy(NORMALIZED_REPORT), file_matcher='fnmatch')
+        analyzer.apply_filters()
+        analyzer.curate_file_licenses([(["*.h", "cairo/doc/README", "xcb"], "bsd-new")])
+        self.assertEqual(["cairo/src/cairo-xcb.h", "cairo/doc/README"],
+                         [c['file'] for c in analyzer.fixes()['curated_licenses']])
+
+    def test_cumulative(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters([], [ScanReportFilter("xcb")])
+        cumulative = analyzer.report()['cumulative']
+        self.assertEqual(simplify(["mit", "missing"]), cumulative['license'])
+
+        analyzer.curate_missing_license(["bsd-new"])
+        self.assertEqual(simplify(["bsd-new", "mit"]), cumulative['license'])
+        # excluded files do not change the cumulative license
+        analyzer.curate_file_licenses([(["cairo.c", "xcb"], "x11")])
+        self.assertEqual(simplify(["bsd-new", "mit", "x11"]), cumulative['license'])
+        self.assertEqual({'license': cumulative['license']}, dict(cumulative))
+
+    def test_summary(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters([], [ScanReportFilter("xcb")])
+        analyzer.curate_file_licenses([(["test.c"], "x11")])
+        cumulative = analyzer.report()['cumulative']
+        self.assertEqual(["missing", "mit", "x11"], cumulative.licenses())
+        self.assertEqual({"mit": 1, "missing": 1, "x11": 1}, cumulative.files_per_license())
+        self.assertEqual(["(c) 2009 Some One", "(c) 2010 Some Other"], cumulative.copyrights())
+        analyzer.curate_missing_license(["mit"])
+        self.assertEqual({"mit": 2, "x11": 1}, cumulative.files_per_license())
+
+    def test_filter_curated(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters()
+        analyzer.curate_file_licenses([(["xcb"], "bsd-new")])
+        analyzer.apply_filters([ScanReportFilter("bsd", ScanReportFilterType.LICENSE),
+                                ScanReportFilter("Other", ScanReportFilterType.COPYRIGHT)])
+        self.assertEqual(["cairo/src/cairo-xcb.c", "cairo/src/cairo-xcb.h", "cairo/test/test.c"],
+                         self._paths(analyzer.report()['files']))
+
+    def test_file_filters_indexed_once(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters([ScanReportFilter("src/")], [ScanReportFilter("xcb")])
+        path_indexes = dict(analyzer.path_indexes)
+        analyzer.apply_filters([ScanReportFilter("src/")], [ScanReportFilter("xcb")])
+        self.assertEqual(["cairo/src/cairo.c"], self._paths(analyzer.report()['files']))
+        self.assertEqual(2, len(analyzer.path_indexes))
+        for exprs, path_index in path_indexes.items():
+            self.assertIs(path_index, analyzer.path_indexes[exprs])
+
+    def test_query(self):
+        analyzer = self._analyzer()
+        analyzer.apply_filters([ScanReportFilter("license:gpl or license=mit", ScanReportFilterType.QUERY)],
+                               [ScanReportFilter("path^=cairo/test/", ScanReportFilterType.QUERY)])
+        self.assertEqual(["cairo/src/cairo.c", "cairo/src/cairo-xcb.c"], self._paths(analyzer.report()['files']))
+        self.assertEqual([
+            {'file': "cairo/src/cairo-xcb.h", 'reason': 'not included', 'type': 'query', 'filter': None},
+            {'file': "cairo/doc/README", 'reason': 'not included', 'type': 'query', 'filter': None},
+            {'file': "cairo/test/test.c", 'reason': 'excluded', 'type': 'query', 'filter': "path^=cairo/test/"},
+        ], analyzer.fixes()['exclusions'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import copy
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import yaml
+
+from tests.test_scanreader import SCANCODE_REPORT
+
+TOP_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+def _gpl_report():
+    report = copy.deepcopy(SCANCODE_REPORT)
+    f = report['files'][1]
+    f['detected_license_expression'] = "gpl-2.0-only"
+    f['license_detections'][0]['license_expression'] = "gpl-2.0-only"
+    return report
+
+class TestBatch(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestBatch, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.report_dir = tempfile.mkdtemp()
+        with open(self._path('b.json'), 'w') as fp:
+            json.dump(SCANCODE_REPORT, fp)
+        with gzip.open(self._path('a.json.gz'), 'wt') as fp:
+            json.dump(_gpl_report(), fp)
+        with open(self._path('c.json'), 'w') as fp:
+            fp.write(json.dumps(SCANCODE_REPORT)[:200])
+        with open(self._path('notes.txt'), 'w') as fp:
+            fp.write("not a scan report")
+
+    def tearDown(self):
+        shutil.rmtree(self.report_dir)
+
+    def _path(self, name):
+        return os.path.join(self.report_dir, name)
+
+    def _scarfer(self, *args):
+        env = dict(os.environ, PYTHONPATH=TOP_DIR)
+        return subprocess.run([sys.executable, '-m', 'scarfer'] + list(args), env=env, cwd=TOP_DIR,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, universal_newlines=True)
+
+    def test_directory(self):
+        process = self._scarfer(self.report_dir, '-l')
+        reports = [line for line in process.stdout.splitlines() if line.startswith('Report: ')]
+        # the reports in the directory, in name order
+        self.assertEqual([f'Report: {self._path(name)}' for name in ['a.json.gz', 'b.json', 'c.json']], reports)
+        self.assertIn(f'Could not read scan report file: {self._path("c.json")}', process.stderr)
+        # the report not read is left out of the summary
+        self.assertIn('Summary of 2 reports', process.stdout)
+        self.assertIn('gpl-2.0-only', process.stdout.split('Summary of 2 reports')[1])
+
+    def test_directory_one_report(self):
+        for name in ['a.json.gz', 'c.json']:
+            os.remove(self._path(name))
+        output = self._scarfer(self.report_dir, '-l').stdout
+        self.assertIn(f'Report: {self._path("b.json")}', output)
+        self.assertIn('Summary of 1 reports', output)
+
+    def test_json_yaml(self):
+        # one document with the reports, the report not read only with
+        # its file, and the summary
+        files = [self._path(name) for name in ['b.json', 'c.json', 'a.json.gz']]
+        for output_format, load in [('json', json.loads), ('yaml', yaml.safe_load)]:
+            output = load(self._scarfer(*files, '-f', output_format, '-l').stdout)
+            self.assertEqual(files, [report['file'] for report in output['reports']])
+            self.assertEqual(['src/apa.c', 'src/bepa.c'], [f['path'] for f in output['reports'][0]['files']])
+            self.assertEqual({'file': files[1]}, output['reports'][1])
+            self.assertEqual(2, output['summary']['reports'])
+            self.assertIn('gpl-2.0-only', output['summary']['license'])
+
+            output = load(self._scarfer(*files, '-f', output_format, '-cu').stdout)
+            self.assertIn('gpl-2.0-only', output['reports'][2]['cumulative']['license'])
+
+            output = load(self._scarfer(*files, '-f', output_format, '--normalize', '--stream').stdout)
+            self.assertEqual(['src/apa.c', 'src/bepa.c'],
+                             [f['path'] for f in output['reports'][0]['normalized']['files']])
+            self.assertNotIn('summary', output)
+
+    def test_jobs(self):
+        files = [self._path(name) for name in ['b.json', 'c.json', 'a.json.gz']]
+        output = self._scarfer(*files, '-l', '-j', '1').stdout
+        self.assertEqual(output, self._scarfer(*files, '-l', '-j', '3').stdout)
+        self.assertLess(output.index(files[0]), output.index(files[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from scarfer.cache import ReportCache
+
+class TestReportCache(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestReportCache, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.reads = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _report(self, name, content):
+        report_file = os.path.join(self.tmp_dir, name)
+        with open(report_file, 'w') as fp:
+            fp.write(content)
+        return report_file
+
+    def _read(self, value):
+        def read_function():
+            self.reads += 1
+            return {"files": [value] * 1000}
+        return read_function
+
+    def test_cache_hit(self):
+        cache = ReportCache(self.cache_dir)
+        report_file = self._report("report.json", "{}")
+        first = cache.load(report_file, 'read', self._read("apa.c"))
+        second = cache.load(report_file, 'read', self._read("apa.c"))
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.reads)
+
+        # another variant is cached separately
+        cache.load(report_file, 'other', self._read("apa.c"))
+        self.assertEqual(2, self.reads)
+
+    def test_same_content(self):
+        cache = ReportCache(self.cache_dir)
+        cache.load(self._report("report.json", "{}"), 'read', self._read("apa.c"))
+        cache.load(self._report("copy.json", "{}"), 'read', self._read("apa.c"))
+        self.assertEqual(1, self.reads)
+
+    def test_eviction(self):
+        cache = ReportCache(self.cache_dir, max_size=1)
+        report_file = self._report("report.json", "{}")
+        cache.load(report_file, 'read', self._read("apa.c"))
+        cache.load(report_file, 'read', self._read("apa.c"))
+        self.assertEqual(2, self.reads)
+        self.assertEqual([], os.listdir(os.path.join(self.cache_dir, "data")))
+
+
+if __name__ == '__main__':
+    unittest.main()
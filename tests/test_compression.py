@@ -0,0 +1,63 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bz2
+import gzip
+import json
+import lzma
+import os
+import tempfile
+import unittest
+
+from scarfer.compression import compression
+from scarfer.compression import open_text
+from scarfer.compression import GZIP, XZ, BZIP2
+from scarfer.scan_interface import ScanReportReader
+from tests.test_scanreader import SCANCODE_REPORT
+
+COMPRESSORS = {
+    GZIP: gzip.compress,
+    XZ: lzma.compress,
+    BZIP2: bz2.compress,
+}
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.report_file = self._write("scan.json", json.dumps(SCANCODE_REPORT).encode('utf-8'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, name, content):
+        file_name = os.path.join(self.tmp_dir.name, name)
+        with open(file_name, 'wb') as fp:
+            fp.write(content)
+        return file_name
+
+    def _compressed(self, kind):
+        with open(self.report_file, 'rb') as fp:
+            return self._write(f'scan-{kind}.json', COMPRESSORS[kind](fp.read()))
+
+    def test_compression(self):
+        self.assertIsNone(compression(self.report_file))
+        for kind in COMPRESSORS:
+            self.assertEqual(kind, compression(self._compressed(kind)))
+
+    def test_open_text(self):
+        for kind in COMPRESSORS:
+            with open_text(self._compressed(kind)) as fp:
+                self.assertEqual(SCANCODE_REPORT, json.load(fp))
+
+    def test_read(self):
+        expected = ScanReportReader(self.report_file).read()['files']
+        for kind in COMPRESSORS:
+            compressed = self._compressed(kind)
+            self.assertEqual(expected, ScanReportReader(compressed).read()['files'])
+            self.assertEqual(expected, list(ScanReportReader(compressed).read_stream()['files']))
+
+
+if __name__ == '__main__':
+    unittest.main()
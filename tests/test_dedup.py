@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import copy
+import unittest
+
+from scarfer.analyzer import Analyzer
+from scarfer.analyzer import ScanReportFilter
+from scarfer.analyzer import ScanReportFilterType
+from scarfer.dedup import ContentGroups
+from tests.normalized import normalized_file
+
+
+FILES = [
+    normalized_file("LICENSE", ["mit"], ["(c) Some One"], sha1="aa"),
+    normalized_file("src/main.c", ["mit"], sha1="bb"),
+    normalized_file("vendor/a/LICENSE", ["mit"], ["(c) Some One"], sha1="AA"),
+    normalized_file("vendor/b/LICENSE", ["bsd-new"], sha1="aa"),
+    normalized_file("vendor/c/LICENSE", ["mit"], ["(c) Some One"], sha1="aa"),
+    normalized_file("src/util.c", ["mit"], sha1=None),
+    normalized_file("src/other.c", ["mit"], sha1=None),
+]
+
+class TestDedup(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestDedup, self).__init__(*args, **kwargs)
+
+    def test_groups(self):
+        groups = ContentGroups(FILES)
+        self.assertEqual([[0, 2, 4], [1], [3], [5], [6]], [group.indexes for group in groups])
+        report = groups.report()
+        self.assertEqual(["LICENSE", "vendor/a/LICENSE", "vendor/c/LICENSE"], report[0]['paths'])
+        self.assertEqual(["(c) Some One"], report[0]['copyrights'])
+
+    def test_analyzer(self):
+        filters = [ScanReportFilter("mit", ScanReportFilterType.LICENSE)]
+        exclude_filters = [ScanReportFilter("One", ScanReportFilterType.COPYRIGHT)]
+        analyzer = Analyzer({'files': copy.deepcopy(FILES)})
+        analyzer.apply_filters(filters, exclude_filters)
+        dedup_analyzer = Analyzer({'files': copy.deepcopy(FILES)}, dedup=True)
+        dedup_analyzer.apply_filters(filters, exclude_filters)
+        self.assertEqual(5, len(dedup_analyzer.content_groups))
+        self.assertEqual(analyzer.report()['files'], dedup_analyzer.report()['files'])
+        self.assertEqual(analyzer.fixes()['exclusions'], dedup_analyzer.fixes()['exclusions'])
+        self.assertEqual([["src/main.c"], ["src/util.c"], ["src/other.c"]],
+                         [group['paths'] for group in dedup_analyzer.grouped()])
+
+    def test_curated(self):
+        # files curated after grouping are filtered on their curated
+        # licenses
+        files = [normalized_file("a/x.c", ["mit"], sha1="aa"), normalized_file("b/x.c", ["mit"], sha1="aa")]
+        filters = [ScanReportFilter("gpl", ScanReportFilterType.LICENSE)]
+        for dedup in [False, True]:
+            analyzer = Analyzer({'files': copy.deepcopy(files)}, dedup=dedup)
+            analyzer.apply_filters()
+            analyzer.curate_file_license(['b/x.c'], 'gpl-2.0')
+            analyzer.apply_filters(filters)
+            self.assertEqual(['b/x.c'], [f['path'] for f in analyzer.report()['files']])
+            analyzer.apply_filters()
+            self.assertEqual([['a/x.c'], ['b/x.c']], [group['paths'] for group in analyzer.grouped()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import copy
+import unittest
+
+from scarfer.delta import ReportDelta
+from tests.normalized import normalized_file
+
+
+BASELINE = [
+    normalized_file("src/same.c", ["mit"], sha1="aa"),
+    normalized_file("src/license.c", ["mit"], sha1="bb"),
+    normalized_file("src/content.c", ["mit"], sha1="cc"),
+    normalized_file("src/copyright.c", ["mit"], ["(c) Some One"], sha1="dd"),
+    normalized_file("src/moved.c", ["mit"], sha1="ee"),
+    normalized_file("src/removed.c", ["mit"], sha1="ff"),
+]
+
+REPORT = [
+    normalized_file("src/same.c", ["mit"], sha1="AA"),
+    normalized_file("src/license.c", ["bsd-new"], sha1="bb"),
+    normalized_file("src/content.c", ["mit"], sha1="c0"),
+    normalized_file("src/copyright.c", ["mit"], ["(c) Some One", "(c) Some Other"], sha1="dd"),
+    normalized_file("lib/moved.c", ["mit"], sha1="ee"),
+    normalized_file("src/added.c", ["mit"], sha1="11"),
+]
+
+class TestDelta(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestDelta, self).__init__(*args, **kwargs)
+
+    def _delta(self):
+        return ReportDelta(copy.deepcopy(BASELINE), copy.deepcopy(REPORT))
+
+    def test_delta(self):
+        delta = self._delta()
+        self.assertEqual(["src/removed.c"], [f['path'] for f in delta.baseline_files()][:1])
+        report = delta.report()
+        self.assertEqual(["src/added.c"], [f['path'] for f in report['added']])
+        self.assertEqual(["src/removed.c"], [f['path'] for f in report['removed']])
+        changed = {c['path']: c for c in report['changed']}
+        self.assertEqual(["src/license.c", "src/content.c", "src/copyright.c", "lib/moved.c"], list(changed))
+        self.assertEqual({'baseline': ["mit"], 'report': ["bsd-new"]}, changed["src/license.c"]['licenses'])
+        self.assertFalse(changed["src/license.c"]['content_changed'])
+        self.assertTrue(changed["src/content.c"]['content_changed'])
+        self.assertEqual({'added': ["(c) Some Other"], 'removed': []}, changed["src/copyright.c"]['copyrights'])
+        self.assertEqual("src/moved.c", changed["lib/moved.c"]['baseline_path'])
+
+    def test_keep(self):
+        delta = self._delta()
+        baseline_files = delta.baseline_files()
+        report_files = delta.report_files()
+        # as if license.c was curated to its baseline license, and
+        # content.c was filtered out of the report
+        report_files[1]['license']['expressions'] = ["mit"]
+        kept = [f for f in report_files if f['path'] != "src/content.c"]
+        delta.keep(baseline_files, kept)
+        report = delta.report()
+        self.assertEqual(["src/added.c"], [f['path'] for f in report['added']])
+        self.assertEqual(["src/removed.c", "src/content.c"], [f['path'] for f in report['removed']])
+        self.assertEqual(["src/copyright.c", "lib/moved.c"], [c['path'] for c in report['changed']])
+
+
+if __name__ == '__main__':
+    unittest.main()
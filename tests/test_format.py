@@ -2,9 +2,23 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import io
 import unittest
+import yaml
 
+from scarfer.cumulative import simplify
 from scarfer.format.factory import FormatFactory
+from scarfer.format.interface import Settings
+from tests.normalized import normalized_file
+
+MATCHES = [{"key": "mit", "text": "Permission is hereby granted"}]
+
+REPORT = {
+    "files": [
+        normalized_file("src/cairo.c", ["mit"], ["(c) 2009 Some One"], matches=MATCHES),
+        normalized_file("src/cairo-xcb.c", ["gpl-2.0-or-later"], matches=MATCHES),
+    ]
+}
 
 class TestFormatter(unittest.TestCase):
 
@@ -15,6 +29,28 @@ class TestFormatter(unittest.TestCase):
         formatter = FormatFactory.formatter("ssss")
         self.assertIsNone(formatter)
 
+    def test_write(self):
+        settings = Settings(copyrights=True, licenses=True, matches=True)
+        for name in ["text", "json", "yaml", "markdown"]:
+            formatter = FormatFactory.formatter(name)
+            for report in [REPORT, {"files": []}]:
+                out = io.StringIO()
+                formatter.write(out, report, settings)
+                self.assertEqual(formatter.format(report, settings) + "\n", out.getvalue())
+
+    def test_yaml(self):
+        formatter = FormatFactory.formatter("yaml")
+        files = yaml.safe_load(formatter.format(REPORT, Settings(licenses=True)))
+        self.assertEqual([{"path": "src/cairo.c", "license": {"expressions": ["mit"]}},
+                          {"path": "src/cairo-xcb.c", "license": {"expressions": ["gpl-2.0-or-later"]}}], files)
+        files = yaml.safe_load(formatter.format(REPORT, Settings(copyrights=True)))
+        self.assertEqual({"path": "src/cairo.c", "copyrights": ["(c) 2009 Some One"]}, files[0])
+        cumulative = yaml.safe_load(formatter.format_cumulative(dict(REPORT)))
+        self.assertEqual({"cumulative": {"license": str(simplify(["mit", "gpl-2.0-or-later"]))}}, cumulative)
+        fixes = {'excluded_files': REPORT['files'], 'exclusions': [], 'missing_license': [], 'curated_licenses': []}
+        fixes = yaml.safe_load(formatter.format_fixes(fixes, Settings(licenses=True)))
+        self.assertEqual({"path": "src/cairo.c", "license": {"expressions": ["mit"]}}, fixes['excluded_files'][0])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import io
+import json
+import unittest
+
+from scarfer.format.factory import FormatFactory
+from scarfer.format.format_jsonl import JsonLinesFormatter
+from scarfer.format.interface import Settings
+
+def _file(path, expressions, copyrights=[]):
+    return {
+        "path": path,
+        "sha1": None,
+        "md5": None,
+        "sha256": None,
+        "copyrights": copyrights,
+        "license": {
+            "expressions": expressions,
+            "matches": []
+        }
+    }
+
+
+FILES = [
+    _file("src/cairo.c", ["mit"], ["(c) 2009 Some One"]),
+    _file("src/cairo-xcb.c", ["mit"], ["(c) 2009 Some One", "(c) 2010 Some Other"]),
+]
+
+class TestJsonLinesFormatter(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestJsonLinesFormatter, self).__init__(*args, **kwargs)
+
+    def _records(self, report, settings=Settings()):
+        out = io.StringIO()
+        FormatFactory.formatter("jsonl").write(out, report, settings)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_formatter(self):
+        self.assertIsInstance(FormatFactory.formatter("jsonl"), JsonLinesFormatter)
+        self.assertIsInstance(FormatFactory.formatter("NDJSON"), JsonLinesFormatter)
+
+    def test_write(self):
+        self.assertEqual(FILES, self._records({"files": FILES}))
+        self.assertEqual([], self._records({"files": []}))
+
+    def test_trailing_records(self):
+        report = {"files": FILES, "fixes": {"excluded_files": []}}
+        records = self._records(report, Settings(append_summary=True, append_fixes=True))
+        self.assertEqual(FILES, records[:2])
+        self.assertEqual({"license": "mit",
+                          "licenses": {"mit": 2},
+                          "copyrights": {"(c) 2009 Some One": 2, "(c) 2010 Some Other": 1}},
+                         records[2]['summary'])
+        self.assertEqual({"fixes": {"excluded_files": []}}, records[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
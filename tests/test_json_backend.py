@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from scarfer import json_backend
+
+DATA = {"files": [{"path": "src/apa.c", "copyrights": ["(c) 2009 Söme Öne"], "size": 12345678901234567890}]}
+
+class TestJsonBackend(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestJsonBackend, self).__init__(*args, **kwargs)
+
+    def test_load_file(self):
+        fd, json_file = tempfile.mkstemp(suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as fp:
+                json.dump(DATA, fp)
+            self.assertEqual(DATA, json_backend.load_file(json_file))
+            with open(json_file, 'w') as fp:
+                pass
+            with self.assertRaises(ValueError):
+                json_backend.load_file(json_file)
+        finally:
+            os.remove(json_file)
+
+    def test_dumps(self):
+        self.assertEqual(json.dumps(DATA, indent=4), json_backend.dumps(DATA, indent=4))
+        self.assertEqual(json.dumps(DATA, separators=(',', ':'), ensure_ascii=False), json_backend.dumps(DATA))
+        self.assertEqual(DATA, json.loads(json_backend.dumps(DATA, indent=2)))
+
+        # the same output with orjson and the json module
+        if json_backend.orjson is None:
+            return
+        data = {"files": [dict(DATA['files'][0], size=1234, empty=[], meta={})]}
+        for indent in [None, 2, 4]:
+            dumped = json_backend.dumps(data, indent=indent)
+            with mock.patch.object(json_backend, 'orjson', None):
+                self.assertEqual(dumped, json_backend.dumps(data, indent=indent))
+
+    def test_write(self):
+        data = dict(DATA, empty=[], meta={"tool": "scancode"})
+        for indent in [None, 2, 4]:
+            for depth in [0, 1, 2, 3]:
+                fp = io.StringIO()
+                json_backend.write(fp, data, indent=indent, depth=depth)
+                self.assertEqual(json_backend.dumps(data, indent=indent), fp.getvalue())
+        fp = io.StringIO()
+        json_backend.write(fp, (f for f in DATA['files']), indent=4)
+        self.assertEqual(json_backend.dumps(DATA['files'], indent=4), fp.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import io
+import json
+import unittest
+
+from scarfer.json_stream import JsonObjectStream
+from scarfer.json_stream import JsonStreamException
+
+DOCUMENT = {
+    "headers": [{"tool_name": "scancode-toolkit", "tool_version": "32.0.0"}],
+    "files": [{"path": f"src/file-{i}.c", "size": i * 1000} for i in range(50)] + [123456789, 1.5e3, None],
+    "empty": [],
+    "tail": 12345
+}
+
+class TestJsonStream(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestJsonStream, self).__init__(*args, **kwargs)
+
+    def _read(self, text, chunk_size):
+        read = {}
+        stream = JsonObjectStream(io.StringIO(text), lazy_keys=['files', 'empty'], chunk_size=chunk_size)
+        for key, value in stream.items():
+            if key in ['files', 'empty']:
+                value = list(value)
+            read[key] = value
+        return read
+
+    def test_small_chunks(self):
+        text = json.dumps(DOCUMENT, indent=4)
+        for chunk_size in [1, 3, 17, 4096]:
+            self.assertEqual(DOCUMENT, self._read(text, chunk_size))
+
+    def test_skip_lazy_values(self):
+        stream = JsonObjectStream(io.StringIO(json.dumps(DOCUMENT)), lazy_keys=['files'], chunk_size=5)
+        keys = [key for key, value in stream.items()]
+        self.assertEqual(list(DOCUMENT.keys()), keys)
+
+    def test_bad_document(self):
+        with self.assertRaises(JsonStreamException):
+            self._read('{"files": [1, 2', 4)
+
+    def test_error_offset(self):
+        # offsets in the document, not in the buffer read
+        text = json.dumps(DOCUMENT)
+        offset = text.index('"src/file-40.c"')
+        text = text[:offset] + '?' + text[offset + 1:]
+        for chunk_size in [3, 17, 4096]:
+            with self.assertRaises(JsonStreamException) as context:
+                self._read(text, chunk_size)
+            self.assertIn(f'at offset {offset}', context.exception.message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import fnmatch
+import re
+import unittest
+
+from scarfer.matcher import RegexSet
+
+PATHS = [
+    "cairo/src/cairo.c",
+    "cairo/src/cairo-xcb.h",
+    "cairo/doc/README",
+    "cairo/.git/config",
+    "cairo/configure.ac",
+]
+
+class TestMatcher(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestMatcher, self).__init__(*args, **kwargs)
+
+    def _assert_same(self, patterns, use_fnmatch, expected):
+        regex_set = RegexSet(patterns, use_fnmatch)
+        for path in PATHS:
+            index = regex_set.match(path)
+            matching = [pattern for pattern in patterns if expected(pattern, path)]
+            if matching:
+                self.assertIn(patterns[index], matching)
+            else:
+                self.assertIsNone(index)
+            self.assertEqual(matching, [patterns[i] for i in regex_set.match_all(path)])
+
+    def test_regex(self):
+        patterns = [r'\.git/', 'README$', '^cairo/doc', r'xcb\.', 'nomatch']
+        regex_set = RegexSet(patterns)
+        self.assertIsNotNone(regex_set.combined)
+        self._assert_same(patterns, False, lambda pattern, path: re.search(pattern, path) is not None)
+
+    def test_fnmatch(self):
+        patterns = ['*.c', '*/doc/*', 'cairo/configure.*', '*.h']
+        self._assert_same(patterns, True, lambda pattern, path: fnmatch.fnmatch(path, pattern))
+
+    def test_not_combined(self):
+        # groups are renumbered when combined
+        patterns = [r'(c)\1', r'(ai)ro/\.git']
+        regex_set = RegexSet(patterns)
+        self.assertIsNone(regex_set.combined)
+        self._assert_same(patterns, False, lambda pattern, path: re.search(pattern, path) is not None)
+        # inline flags can only start a pattern
+        self.assertIsNone(RegexSet(['(?i)README', 'x']).combined)
+        self.assertEqual(0, RegexSet(['(?i)readme', 'x']).match(PATHS[2]))
+
+    def test_empty(self):
+        self.assertIsNone(RegexSet([]).match(PATHS[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+
+from scarfer.matcher import RegexSet
+from scarfer.path_index import PathIndex
+
+PATHS = [
+    "cairo/src/cairo.c",
+    "cairo/src/cairo-xcb.h",
+    "cairo/doc/README",
+    "cairo/doc/html/index.html",
+    "cairo/autom4te.cache/output.0",
+    "cairo/test/README.md",
+    "cairo/.git/config",
+    "cairo/configure.ac",
+    "README",
+    "src/BUGS\n",
+]
+
+RE_PATTERNS = [
+    'README$',
+    'BUGS$',
+    r'autom4te\.cache/',
+    '^cairo/doc',
+    '^README$',
+    r'\.git/',
+    'test/',
+    r'README[\.\-\w]*',
+    r'cairo\.c',
+    'xcb',
+    '[mM]akefile',
+    'nomatch$',
+]
+
+FNMATCH_PATTERNS = [
+    'README',
+    '*README',
+    '*.h',
+    'cairo/doc/*',
+    '*/.git/*',
+    '*.cache*',
+    '*test*',
+    'cairo/src/cairo.[ch]',
+    'nomatch',
+]
+
+class TestPathIndex(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestPathIndex, self).__init__(*args, **kwargs)
+
+    def _assert_same(self, patterns, use_fnmatch):
+        path_index = PathIndex(patterns, use_fnmatch)
+        regex_set = RegexSet(patterns, use_fnmatch)
+        for path in PATHS:
+            expected = regex_set.match_all(path)
+            self.assertEqual(expected, path_index.match_all(path), path)
+            index = path_index.match(path)
+            if expected:
+                self.assertIn(index, expected)
+            else:
+                self.assertIsNone(index)
+
+    def test_regex(self):
+        path_index = PathIndex(RE_PATTERNS)
+        self.assertEqual([7, 10], path_index.regex_indexes)
+        self._assert_same(RE_PATTERNS, False)
+
+    def test_fnmatch(self):
+        path_index = PathIndex(FNMATCH_PATTERNS, True)
+        self.assertEqual([7], path_index.regex_indexes)
+        self._assert_same(FNMATCH_PATTERNS, True)
+
+    def test_directory(self):
+        path_index = PathIndex(RE_PATTERNS)
+        self.assertEqual(3, path_index.match("cairo/doc/html/index.html"))
+        self.assertEqual([3], path_index.directories["cairo/doc/html/"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import unittest
+
+from scarfer.query import InSet
+from scarfer.query import Or
+from scarfer.query import Predicate
+from scarfer.query import Query
+from scarfer.query import QueryException
+from scarfer.scan_interface import FIELD_COPYRIGHTS
+from scarfer.scan_interface import FIELD_HASHES
+from tests.test_analyzer import NORMALIZED_REPORT
+
+FILES = NORMALIZED_REPORT['files']
+
+class TestQuery(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestQuery, self).__init__(*args, **kwargs)
+
+    def _paths(self, text, plan=True):
+        query = Query(text)
+        if plan:
+            query.plan(FILES)
+        return [f['path'] for f in FILES if query.matches(f)]
+
+    def test_predicates(self):
+        self.assertEqual(["cairo/src/cairo-xcb.c", "cairo/src/cairo-xcb.h"], self._paths('path:xcb'))
+        self.assertEqual(["cairo/doc/README"], self._paths('path=cairo/doc/README'))
+        self.assertEqual(["cairo/test/test.c"], self._paths('path^=cairo/test/'))
+        self.assertEqual(["cairo/src/cairo-xcb.h"], self._paths('path$=.h'))
+        self.assertEqual(["cairo/src/cairo.c", "cairo/test/test.c"], self._paths('license=mit'))
+        self.assertEqual(["cairo/doc/README"], self._paths('license:missing'))
+        self.assertEqual(["cairo/test/test.c"], self._paths('copyright:"Some Other"'))
+        self.assertEqual([], self._paths('sha1=DA39A3EE5E6B4B0D3255BFEF95601890AFD80709'))
+
+    def test_operators(self):
+        expected = ["cairo/src/cairo-xcb.c", "cairo/src/cairo.c"]
+        for plan in [False, True]:
+            self.assertEqual(["cairo/src/cairo.c", "cairo/src/cairo-xcb.c"],
+                             self._paths('(license:gpl or license=mit) and not path^=cairo/test/', plan))
+            self.assertEqual(sorted(expected),
+                             sorted(self._paths('path^=cairo/src/ and NOT (path$=.h)', plan)))
+            self.assertEqual(["cairo/src/cairo.c", "cairo/doc/README", "cairo/test/test.c"],
+                             self._paths('path=cairo/doc/README or license=mit or path=nothing', plan))
+            self.assertEqual(["cairo/src/cairo-xcb.h"], self._paths('not not path:xcb and not path:".c$"', plan))
+
+    def test_plan(self):
+        query = Query('path:xcb or path=cairo/doc/README or license=mit or path=cairo/src/cairo.c')
+        query.plan(FILES)
+        self.assertIsInstance(query.tree, Or)
+        operands = query.tree.operands
+        self.assertEqual(3, len(operands))
+        self.assertIsInstance(operands[0], InSet)
+        self.assertEqual(set(["cairo/doc/README", "cairo/src/cairo.c"]), operands[0].values)
+        # the regular expression, most expensive, is matched last
+        self.assertIsInstance(operands[-1], Predicate)
+        self.assertEqual(':', operands[-1].operator)
+
+    def test_fields(self):
+        self.assertEqual(set(), Query('path:a and license:b').fields())
+        self.assertEqual(set([FIELD_COPYRIGHTS, FIELD_HASHES]), Query('copyright:a or not md5=b').fields())
+
+    def test_invalid(self):
+        for text in ['', 'path', 'gpl', 'name:a', 'path:a and', '(path:a', 'path:a)', 'path:"("', 'path:(a']:
+            with self.assertRaises(QueryException, msg=text):
+                Query(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
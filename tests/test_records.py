@@ -0,0 +1,52 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import pickle
+import unittest
+
+from scarfer.records import FileRecord
+from scarfer.records import StringTable
+from scarfer.records import to_dict
+from tests.normalized import normalized_file
+
+def _file(path):
+    return normalized_file(path, ["mit"], ["(c) 2009 Some One"],
+                           sha1="da39a3ee5e6b4b0d3255bfef95601890afd80709",
+                           md5="D41D8CD98F00B204E9800998ECF8427E",
+                           matches=[{"key": "mit", "text": "MIT License"}])
+
+class TestRecords(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestRecords, self).__init__(*args, **kwargs)
+
+    def test_dict_view(self):
+        table = StringTable()
+        for path in ["src/apa.c", "apa.c", "src/"]:
+            f = _file(path)
+            record = FileRecord.from_dict(table, f)
+            self.assertEqual(f, record)
+            self.assertEqual(f, record.to_dict())
+            self.assertEqual(f, pickle.loads(pickle.dumps(record)))
+            self.assertEqual(json.dumps(f), json.dumps(record, default=to_dict))
+
+    def test_interned(self):
+        table = StringTable()
+        apa = FileRecord.from_dict(table, _file("src/apa.c"))
+        bepa = FileRecord.from_dict(table, _file("src/bepa.c"))
+        self.assertIs(apa.expressions, bepa.expressions)
+        self.assertIs(apa.matches, bepa.matches)
+        self.assertIs(apa.directory, bepa.directory)
+
+    def test_update(self):
+        record = FileRecord.from_dict(StringTable(), _file("src/apa.c"))
+        record['license']['expressions'] = ['missing']
+        self.assertEqual(['missing'], record['license']['expressions'])
+        record['path'] = "src/bepa.c"
+        self.assertEqual("src/bepa.c", record['path'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,21 +2,136 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import json
+import os
+import tempfile
 import unittest
 
 from scarfer.scan_interface import ScanReportReader
 from scarfer.scan_interface import ScanReportException
+from scarfer.scan_interface import validate_files
+from scarfer.scan_interface import FIELD_COPYRIGHTS
+from jsonschema.exceptions import ValidationError
+
+SCANCODE_REPORT = {
+    "headers": [
+        {
+            "tool_name": "scancode-toolkit",
+            "tool_version": "32.0.0",
+            "output_format_version": "3.0.0"
+        }
+    ],
+    "files": [
+        {
+            "path": "src",
+            "type": "directory"
+        },
+        {
+            "path": "src/apa.c",
+            "type": "file",
+            "sha1": "da39a3ee5e6b4b0d3255bfef95601890afd80709",
+            "md5": "d41d8cd98f00b204e9800998ecf8427e",
+            "sha256": "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855",
+            "detected_license_expression": "mit",
+            "license_detections": [
+                {
+                    "license_expression": "mit",
+                    "matches": [{"license_expression": "mit", "matched_text": "MIT License"}]
+                }
+            ],
+            "copyrights": [{"copyright": "(c) 2009 Some One"}]
+        },
+        {
+            "path": "src/bepa.c",
+            "type": "file",
+            "sha1": None,
+            "md5": None,
+            "sha256": None,
+            "detected_license_expression": None,
+            "license_detections": [],
+            "copyrights": []
+        }
+    ]
+}
 
 class TestScanReader(unittest.TestCase):
 
     def __init__(self, *args, **kwargs):
         super(TestScanReader, self).__init__(*args, **kwargs)
 
+    def setUp(self):
+        fd, self.report_file = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as fp:
+            json.dump(SCANCODE_REPORT, fp, indent=4)
+
+    def tearDown(self):
+        os.remove(self.report_file)
+
     def test_bad_reader(self):
         with self.assertRaises(ScanReportException):
             reader = ScanReportReader("bad-path")
             reader.read()
 
+    def test_unsupported_report(self):
+        with open(self.report_file, 'w') as fp:
+            json.dump({"headers": [{"tool_name": "other-scanner"}], "files": []}, fp)
+        with self.assertRaises(ScanReportException):
+            ScanReportReader(self.report_file).read()
+
+    def test_read(self):
+        report = ScanReportReader(self.report_file).read()
+        self.assertEqual(['src/apa.c', 'src/bepa.c'], [f['path'] for f in report['files']])
+        self.assertEqual(['mit'], report['files'][0]['license']['expressions'])
+        self.assertEqual(['(c) 2009 Some One'], report['files'][0]['copyrights'])
+        self.assertEqual('3.0.0', report['meta']['scanner']['tool_output_format'])
+
+    def test_read_stream(self):
+        report = ScanReportReader(self.report_file).read()
+        streamed_report = ScanReportReader(self.report_file).read_stream()
+        self.assertEqual(report['meta'], streamed_report['meta'])
+        self.assertEqual(report['files'], list(streamed_report['files']))
+
+    def test_read_stream_truncated(self):
+        with open(self.report_file) as fp:
+            content = fp.read()
+        with open(self.report_file, 'w') as fp:
+            fp.write(content[:content.index('src/bepa.c')])
+        streamed_report = ScanReportReader(self.report_file).read_stream()
+        with self.assertRaises(ScanReportException):
+            list(streamed_report['files'])
+
+    def test_read_fields(self):
+        report = ScanReportReader(self.report_file, fields=[]).read()
+        apa = report['files'][0]
+        self.assertEqual('src/apa.c', apa['path'])
+        self.assertEqual(['mit'], apa['license']['expressions'])
+        self.assertEqual([], apa['license']['matches'])
+        self.assertEqual([], apa['copyrights'])
+        self.assertEqual('', apa['sha1'])
+
+        report = ScanReportReader(self.report_file, compact=True, fields=[FIELD_COPYRIGHTS]).read()
+        apa = report['files'][0]
+        self.assertEqual(['(c) 2009 Some One'], apa['copyrights'])
+        self.assertEqual([], apa['license']['matches'])
+
+    def test_validate(self):
+        reader = ScanReportReader(self.report_file)
+        report = reader.read()
+        reader.validate()
+        reader.validate(sample=2)
+
+        bad_file = dict(report['files'][1], copyrights=[None])
+        with self.assertRaises(ValidationError):
+            list(validate_files(report['files'] + [bad_file]))
+        # only the first file is validated
+        self.assertEqual(3, len(list(validate_files(report['files'] + [bad_file], sample=5))))
+
+    def test_validate_stream(self):
+        reader = ScanReportReader(self.report_file)
+        report = reader.read_stream()
+        reader.validate()
+        self.assertEqual(2, len(list(report['files'])))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,37 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import tempfile
+import unittest
+
+from scarfer.simplifier import LicenseSimplifier
+
+EXPRESSION = "( mit ) AND ( mit OR bsd-new )"
+
+class TestSimplifier(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestSimplifier, self).__init__(*args, **kwargs)
+
+    def test_simplify(self):
+        simplifier = LicenseSimplifier()
+        self.assertEqual("mit", simplifier.simplify(EXPRESSION))
+        arbiter = simplifier.arbiter
+        self.assertEqual("mit", simplifier.simplify("( mit ) AND ( mit )"))
+        self.assertIs(arbiter, simplifier.arbiter)
+
+    def test_memo_file(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            memo_file = os.path.join(cache_dir, "scarfer", "simplified.json")
+            self.assertEqual("mit", LicenseSimplifier(memo_file).simplify(EXPRESSION))
+            self.assertTrue(os.path.exists(memo_file))
+            # simplified without flict
+            simplifier = LicenseSimplifier(memo_file)
+            self.assertEqual("mit", simplifier.simplify(EXPRESSION))
+            self.assertIsNone(simplifier.arbiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
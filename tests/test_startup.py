@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2023 Henrik Sandklef
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import subprocess
+import sys
+import unittest
+
+TOP_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# modules, slow to import, only imported by the code using them
+HEAVY_MODULES = ['yaml', 'jsonschema', 'license_expression', 'flict']
+
+# imported in a new python process, since the tests import them all
+IMPORTED_MODULES = '''
+import sys
+import scarfer.__main__
+from scarfer.format.factory import FormatFactory
+FormatFactory.formatter("text")
+print(" ".join(sorted(set([module.split(".")[0] for module in sys.modules]))))
+'''
+
+class TestStartup(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestStartup, self).__init__(*args, **kwargs)
+
+    def test_lazy_imports(self):
+        env = dict(os.environ, PYTHONPATH=TOP_DIR)
+        output = subprocess.run([sys.executable, '-c', IMPORTED_MODULES], env=env, cwd=TOP_DIR,
+                                stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+        imported = output.split()
+        self.assertIn('scarfer', imported)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, imported)
+
+
+if __name__ == '__main__':
+    unittest.main()